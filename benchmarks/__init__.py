@@ -0,0 +1,76 @@
+"""
+Benchmarks for the game jams, run them as modules, e.g. "python -m benchmarks.physics".
+"""
+from __future__ import annotations
+
+import json
+import os
+import platform
+import subprocess
+import time
+from pathlib import Path
+
+# Benchmarks never open a window.
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import pygame  # noqa: E402
+import pymunk  # noqa: E402
+
+
+def print_table(rows: list[dict], columns: list[str]):
+    """
+    Print rows as a plain text table with the given columns.
+    """
+    cells = [[_format(row.get(column, "")) for column in columns] for row in rows]
+    widths = [max([len(column)] + [len(cell[i]) for cell in cells]) for i, column in enumerate(columns)]
+    print("  ".join(column.ljust(width) for column, width in zip(columns, widths)))
+    for cell in cells:
+        print("  ".join(value.rjust(width) for value, width in zip(cell, widths)))
+
+
+def _format(value) -> str:
+    if isinstance(value, float):
+        return f"{value:.2f}"
+    return str(value)
+
+
+def record_results(path, benchmark: str, rows: list[dict], **context) -> list[dict]:
+    """
+    Append rows as JSON lines to path, each tagged with benchmark name, time, git revision,
+    library versions and context, so runs can be compared over time. Returns the written records.
+    """
+    try:
+        revision = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                  cwd=Path(__file__).parent, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        revision = ""
+    tags = {
+        "benchmark": benchmark,
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "revision": revision,
+        "python": platform.python_version(),
+        "pygame": pygame.version.ver,
+        "pymunk": pymunk.version,
+        **context,
+    }
+    records = [dict(tags, **row) for row in rows]
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("a") as f:
+        for record in records:
+            f.write(json.dumps(record) + "\n")
+    return records
+
+
+def load_results(path, benchmark: str) -> list[dict]:
+    """
+    Records of benchmark from a file written by record_results, oldest first.
+    """
+    path = Path(path)
+    if not path.exists():
+        return []
+    with path.open() as f:
+        records = [json.loads(line) for line in f if line.strip()]
+    return [record for record in records if record.get("benchmark") == benchmark]
@@ -0,0 +1,63 @@
+"""
+Memory and load time of TileBoard against the old nested list[list[Tile]] boards.
+"""
+from __future__ import annotations
+
+import argparse
+import time
+import tracemalloc
+from random import Random
+
+from . import print_table
+from game_jams.jam_1.levels.generate import generate_board
+from game_jams.jam_1.levels.raw_level import Tile, TileBoard
+
+
+def nested_board(rows: list[list[str]]) -> list[list[Tile]]:
+    return [[Tile(int(tile)) for tile in row] for row in rows]
+
+
+def measure(name: str, build, rows: list[list[str]]) -> dict:
+    start = time.perf_counter()
+    build(rows)
+    load_time = time.perf_counter() - start
+
+    tracemalloc.start()
+    board = build(rows)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    if isinstance(board, TileBoard):
+        walls = len(board.positions(Tile.wall))
+    else:
+        walls = len([(row_index, col_index) for row_index, row in enumerate(board)
+                     for col_index, tile in enumerate(row) if tile == Tile.wall])
+    query_time = time.perf_counter() - start
+    return {
+        "board": name,
+        "cells": len(rows) * len(rows[0]),
+        "memory_kib": size / 1024,
+        "load_ms": load_time * 1000,
+        "wall_query_ms": query_time * 1000,
+        "walls": walls,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[64, 256, 1024])
+    args = parser.parse_args()
+
+    results = []
+    for size in args.sizes:
+        board = generate_board(size, size, Random(size))
+        # csv style rows of strings, what parsing a level file hands to the board
+        rows = [list(map(str, board.row(row_index))) for row_index in range(board.height)]
+        results.append(measure(f"nested {size}", nested_board, rows))
+        results.append(measure(f"TileBoard {size}", TileBoard.from_rows, rows))
+    print_table(results, ["board", "cells", "memory_kib", "load_ms", "wall_query_ms", "walls"])
+
+
+if __name__ == "__main__":
+    main()
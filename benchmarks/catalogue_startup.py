@@ -0,0 +1,51 @@
+"""
+Startup cost of the level catalogue: eager parsing against LevelCatalogue.
+"""
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from . import print_table
+from game_jams.jam_1.levels.generate import generate_level
+from game_jams.jam_1.levels.raw_level import LevelCatalogue, Tile, dump_csv_level, list_raw_levels, load_level_file
+
+
+def eager(levels_dir: Path) -> int:
+    loaded = [load_level_file(file) for files in list_raw_levels(levels_dir).values() for file in files.values()]
+    return len(loaded)
+
+
+def lazy_menu(levels_dir: Path) -> int:
+    # everything the level selection screen touches: numbers and titles
+    catalogue = LevelCatalogue(levels_dir)
+    return len([catalogue[world].info(num).title for world in catalogue for num in catalogue[world]])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--worlds", type=int, default=20)
+    parser.add_argument("--levels", type=int, default=20)
+    parser.add_argument("--size", type=int, default=64)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        levels_dir = Path(tmp)
+        for world in range(1, args.worlds + 1):
+            for num in range(1, args.levels + 1):
+                level = generate_level(args.size, seed=world * 1000 + num, counts={Tile.movable: 4})
+                dump_csv_level(level, levels_dir / f"level_{world}_{num}.csv")
+
+        results = []
+        for name, func in (("eager parse", eager), ("lazy catalogue", lazy_menu)):
+            list_raw_levels.cache_clear()
+            start = time.perf_counter()
+            count = func(levels_dir)
+            results.append({"startup": name, "levels": count, "ms": (time.perf_counter() - start) * 1000})
+        print_table(results, ["startup", "levels", "ms"])
+
+
+if __name__ == "__main__":
+    main()
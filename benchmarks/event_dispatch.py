@@ -0,0 +1,87 @@
+"""
+Event storm latency: pooled events checked against key sets in update, against the scene dispatch table.
+"""
+from __future__ import annotations
+
+import argparse
+import time
+
+import pygame as pg
+
+from . import print_table
+from game_jams.engine import BaseScene, GameState
+from game_jams.engine.base_scene import SceneManager
+
+
+class PooledScene(BaseScene):
+    """
+    Old style: every event is pooled and update checks each one against key sets.
+    """
+
+    def init(self):
+        self.moves = 0
+        self.bind(pg.KEYDOWN, self.add_event_to_pool)
+        self.bind(pg.JOYAXISMOTION, self.add_event_to_pool)
+
+    def update(self, delta_time: float):
+        for event in self.get_events():
+            if event.type == pg.KEYDOWN:
+                if event.key in {pg.K_a, pg.K_LEFT}:
+                    self.moves -= 1
+                if event.key in {pg.K_d, pg.K_RIGHT}:
+                    self.moves += 1
+
+
+class DispatchScene(BaseScene):
+    def init(self):
+        self.moves = 0
+        self.bind_keys(pg.KEYDOWN, (pg.K_a, pg.K_LEFT), self.left)
+        self.bind_keys(pg.KEYDOWN, (pg.K_d, pg.K_RIGHT), self.right)
+
+    def left(self, event: pg.event.Event):
+        self.moves -= 1
+
+    def right(self, event: pg.event.Event):
+        self.moves += 1
+
+
+def storm(size: int) -> list[pg.event.Event]:
+    events = []
+    for index in range(size):
+        if index % 10 == 0:
+            events.append(pg.event.Event(pg.KEYDOWN, key=pg.K_RIGHT, mod=0, unicode="", scancode=0))
+        else:
+            events.append(pg.event.Event(pg.JOYAXISMOTION, joy=0, instance_id=0, axis=index % 4, value=0.5))
+    return events
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--events", type=int, default=10_000)
+    parser.add_argument("--frames", type=int, default=20)
+    args = parser.parse_args()
+
+    manager = SceneManager()
+    manager.init(GameState(60, (1, 1)))
+    events = storm(args.events)
+    results = []
+    for scene_class in (PooledScene, DispatchScene):
+        manager.spawn_scene(scene_class)
+        start = time.perf_counter()
+        for _ in range(args.frames):
+            for event in events:
+                manager.handle_events(event)
+            manager.current.update(1 / 60)
+        elapsed = time.perf_counter() - start
+        results.append({
+            "scene": scene_class.__name__,
+            "events_per_frame": args.events,
+            "frame_ms": elapsed * 1000 / args.frames,
+            "ns_per_event": elapsed * 1e9 / args.frames / args.events,
+            "moves": manager.current.moves,
+        })
+    print_table(results, ["scene", "events_per_frame", "frame_ms", "ns_per_event", "moves"])
+
+
+if __name__ == "__main__":
+    main()
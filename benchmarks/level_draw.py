@@ -0,0 +1,70 @@
+"""
+Frame time of space.debug_draw against LevelRenderer, which only draws what its camera sees, standing still
+and panning over the level, and time to build the static chunks in view from shapes or from atlas sprites.
+Renderer frame time should stay flat as levels grow.
+"""
+from __future__ import annotations
+
+import argparse
+import time
+
+import pygame as pg
+
+from . import print_table
+from game_jams.jam_1.levels.convert_level import PymunkLevel
+from game_jams.jam_1.levels.generate import generate_level
+from game_jams.jam_1.levels.raw_level import Tile
+from game_jams.jam_1.levels.render_level import LevelRenderer
+from game_jams.engine.scene_tools import percentiles
+
+
+def measure(name: str, draw, frames: int) -> dict:
+    draw()
+    frame_times = []
+    for _ in range(frames):
+        start = time.perf_counter()
+        draw()
+        frame_times.append(time.perf_counter() - start)
+    p50, p99 = percentiles(frame_times, 50, 99)
+    return {"draw": name, "p50_ms": p50 * 1000, "p99_ms": p99 * 1000}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[25, 128, 256, 512])
+    parser.add_argument("--frames", type=int, default=50)
+    args = parser.parse_args()
+
+    screen = pg.Surface((800, 800))
+    results = []
+    for size in args.sizes:
+        level = PymunkLevel(generate_level(size, seed=size, counts={Tile.movable: 32}))
+        level.set_pygame_screen(screen)
+        camera = level.renderer.camera
+
+        def pan():
+            camera.x = (camera.x + 16) % max(camera.world_size[0] - camera.size[0], 1)
+            level.draw()
+
+        for name, draw in (("debug_draw", level.debug_draw), ("renderer", level.draw), ("renderer panning", pan)):
+            result = measure(f"{name} {size}", draw, args.frames)
+            result["shapes"] = len(level.space.shapes)
+            result["drawn"] = result["shapes"] if name == "debug_draw" else level.renderer.drawn_shapes
+            results.append(result)
+        for name, use_atlas in (("chunks from shapes", False), ("chunks from atlas", True)):
+            renderer = LevelRenderer(level)
+            renderer.use_atlas = use_atlas
+
+            def build():
+                renderer.invalidate()
+                renderer.build_static_layer(screen.get_size())
+
+            result = measure(f"{name} {size}", build, args.frames)
+            result["shapes"] = len(level.space.shapes)
+            result["drawn"] = "-"
+            results.append(result)
+    print_table(results, ["draw", "shapes", "drawn", "p50_ms", "p99_ms"])
+
+
+if __name__ == "__main__":
+    main()
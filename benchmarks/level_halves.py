@@ -0,0 +1,46 @@
+"""
+Step cost of both level halves in one shared space against two split spaces, stepped in turn or concurrently.
+"""
+from __future__ import annotations
+
+import argparse
+import math
+
+from . import print_table
+from game_jams.jam_1.levels.generate import generate_level
+from game_jams.jam_1.levels.headless import HeadlessRunner
+from game_jams.jam_1.levels.raw_level import RawLevel, Tile, TileBoard
+
+
+def without_bodies(board: TileBoard) -> TileBoard:
+    """
+    Copy of board with players and movables turned into air, so its half has nothing to simulate.
+    """
+    table = bytes(0 if value in (Tile.player.value, Tile.movable.value) else value for value in range(256))
+    return TileBoard(board.width, board.height, bytearray(board.view.tobytes().translate(table)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", type=int, default=128)
+    parser.add_argument("--movables", type=int, default=200)
+    parser.add_argument("--steps", type=int, default=300)
+    args = parser.parse_args()
+
+    busy = generate_level(args.size, counts={Tile.movable: args.movables})
+    idle_lower = RawLevel(busy.level_info, busy.upper_board, without_bodies(busy.lower_board))
+    results = []
+    for level_name, raw_level in (("both busy", busy), ("lower idle", idle_lower)):
+        for name, options in (("shared", {"layout": "shared"}),
+                              ("split", {"layout": "split"}),
+                              ("split concurrent", {"layout": "split", "concurrent_step": True})):
+            # bodies kept awake, so every space is stepped and halves compare on real steps
+            report = HeadlessRunner(raw_level, sleep_time=math.inf, **options).measure(args.steps, name)
+            row = report.as_dict()
+            row["level"] = level_name
+            results.append(row)
+    print_table(results, ["level", "name", "steps_per_second", "p50_us", "p99_us", "peak_bytes"])
+
+
+if __name__ == "__main__":
+    main()
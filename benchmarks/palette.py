@@ -0,0 +1,50 @@
+"""
+Per-frame background colour: color_iter closure against a shared PaletteCycle,
+and the one-off cost of building palettes.
+"""
+from __future__ import annotations
+
+import argparse
+import time
+
+from . import print_table
+from game_jams.jam_1.color_permutations import color_iter, Palette, PaletteCycle
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--frames", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    results = []
+    closure = color_iter()
+    start = time.perf_counter()
+    for frame in range(args.frames):
+        # scenes threw the closure away every 5 seconds at 60 fps
+        if frame % 300 == 0:
+            closure = color_iter()
+        closure()
+    results.append({"colour": "color_iter closure", "ns_per_frame": (time.perf_counter() - start) * 1e9 / args.frames})
+
+    cycle = PaletteCycle(seed=args.seed)
+    start = time.perf_counter()
+    for _ in range(args.frames):
+        cycle.advance(1 / 60)
+        cycle.color()
+    results.append({"colour": "PaletteCycle", "ns_per_frame": (time.perf_counter() - start) * 1e9 / args.frames})
+
+    # built once, not per frame, the shortest of a few runs
+    for name, build in (("Palette build (one period)", lambda: Palette(cycle.steps)),
+                        ("PaletteCycle build (all periods)", lambda: PaletteCycle(seed=args.seed))):
+        times = []
+        for _ in range(5):
+            start = time.perf_counter()
+            build()
+            times.append(time.perf_counter() - start)
+        results.append({"colour": name, "ns_per_frame": min(times) * 1e9})
+    print_table(results, ["colour", "ns_per_frame"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,29 @@
+"""
+Fixed timestep physics benchmark over every level in the catalogue.
+"""
+from __future__ import annotations
+
+import argparse
+import math
+
+from . import print_table
+from game_jams.jam_1.levels.headless import measure_levels
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--steps", type=int, default=2000)
+    parser.add_argument("--step-size", type=float, default=None)
+    # catalogue levels start at rest, with sleeping every step would be skipped and nothing simulated
+    parser.add_argument("--sleep-time", type=float, default=math.inf,
+                        help="seconds of rest before bodies sleep, never by default")
+    args = parser.parse_args()
+
+    reports = measure_levels(args.steps, args.step_size, sleep_time=args.sleep_time)
+    print_table([report.as_dict() for report in reports],
+                ["name", "steps", "steps_per_second", "p50_us", "p90_us", "p99_us", "max_us",
+                 "allocated_bytes", "peak_bytes", "allocated_blocks", "awake_bodies", "skipped_steps"])
+
+
+if __name__ == "__main__":
+    main()
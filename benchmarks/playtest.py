@@ -0,0 +1,38 @@
+"""
+Headless jam_1 games with random key presses, run on a process pool; reports throughput and any crashes.
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+
+import pygame as pg
+
+from . import print_table
+from game_jams.engine.playtest import run_playtests
+
+keys = [pg.K_RETURN, pg.K_ESCAPE, pg.K_LEFT, pg.K_RIGHT, pg.K_UP, pg.K_DOWN]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--games", type=int, default=8)
+    parser.add_argument("--frames", type=int, default=600)
+    parser.add_argument("--workers", type=int, default=None, help="worker processes, 1 runs games in this process")
+    parser.add_argument("--press-rate", type=float, default=0.05)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    results = run_playtests("game_jams.jam_1:new_game", list(range(args.games)), args.frames, keys,
+                            args.press_rate, args.workers)
+    elapsed = time.perf_counter() - start
+    print_table([result.as_dict() for result in results],
+                ["seed", "frames", "presses", "fps", "scene", "checksum", "error"])
+    frames = sum(result.frames for result in results)
+    print(f"{len(results)} games, {frames} frames in {elapsed:.2f} s, {frames / elapsed:.0f} frames/s overall")
+    sys.exit(0 if all(result.ok for result in results) else 1)
+
+
+if __name__ == "__main__":
+    main()
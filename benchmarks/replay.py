@@ -0,0 +1,49 @@
+"""
+Replay every recorded session in a corpus directory headlessly, timing frames and checking for divergence.
+Record new sessions with "python -m game_jams.jam_1 --record FILE".
+"""
+from __future__ import annotations
+
+import argparse
+import multiprocessing
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from . import print_table
+
+default_corpus = Path(__file__).parent / "replays"
+
+
+def replay_file(path: Path) -> dict:
+    # imported here, every recording gets a fresh process and so fresh jam state
+    from game_jams import jam_1
+
+    game = jam_1.setup()
+    game.profiler.enable()
+    result = jam_1.replay(path)
+    summary = game.profiler.summary()
+    return {
+        "replay": path.name,
+        "frames": result.frames,
+        "fps": result.frames_per_second,
+        "p99_ms": summary["frame"]["p99"],
+        "diverged_at": "-" if result.ok else result.first_divergence,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("corpus", nargs="?", type=Path, default=default_corpus)
+    args = parser.parse_args()
+
+    paths = sorted(args.corpus.glob("*.rpl"))
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(1, mp_context=context, max_tasks_per_child=1) as pool:
+        results = list(pool.map(replay_file, paths))
+    print_table(results, ["replay", "frames", "fps", "p99_ms", "diverged_at"])
+    sys.exit(1 if any(result["diverged_at"] != "-" for result in results) else 0)
+
+
+if __name__ == "__main__":
+    main()
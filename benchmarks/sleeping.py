@@ -0,0 +1,33 @@
+"""
+Step cost of a level left at rest, with bodies falling asleep against sleeping disabled.
+"""
+from __future__ import annotations
+
+import argparse
+import math
+
+from . import print_table
+from game_jams.jam_1.levels.generate import generate_level
+from game_jams.jam_1.levels.headless import HeadlessRunner
+from game_jams.jam_1.levels.raw_level import Tile
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", type=int, default=64)
+    parser.add_argument("--movables", type=int, default=64)
+    parser.add_argument("--steps", type=int, default=1200)
+    args = parser.parse_args()
+
+    raw_level = generate_level(args.size, counts={Tile.movable: args.movables})
+    results = []
+    for name, sleep_time in (("never sleep", math.inf), ("sleep after 0.5 s", 0.5)):
+        for layout in ("shared", "split"):
+            report = HeadlessRunner(raw_level, layout=layout, sleep_time=sleep_time).measure(args.steps, name)
+            results.append(dict(report.as_dict(), layout=layout))
+    print_table(results, ["name", "layout", "steps_per_second", "p50_us", "p99_us", "awake_bodies", "bodies",
+                           "skipped_steps"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+SpatialIndex queries against full board scans, on generated boards.
+"""
+from __future__ import annotations
+
+import argparse
+import itertools
+import time
+from random import Random
+
+from . import print_table
+from game_jams.jam_1.levels.generate import generate_level
+from game_jams.jam_1.levels.raw_level import Tile
+from game_jams.jam_1.levels.spatial_index import SpatialIndex
+
+
+def timed(func, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) * 1000 / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[64, 256, 512])
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    results = []
+    for size in args.sizes:
+        board = generate_level(size, seed=size).upper_board
+        start = time.perf_counter()
+        index = SpatialIndex(board)
+        build_ms = (time.perf_counter() - start) * 1000
+        rng = Random(size)
+        points = [(rng.randrange(size), rng.randrange(size)) for _ in range(args.repeat)]
+        cycle = itertools.cycle(points)
+        mid = size - 1
+
+        def scan_region():
+            row, col = next(cycle)
+            return [(r, c) for r, c in board.positions(Tile.movable) if abs(r - row) <= 8 and abs(c - col) <= 8]
+
+        results += [
+            {"board": size, "query": "build index", "ms": build_ms},
+            {"board": size, "query": "scan movables near", "ms": timed(scan_region, args.repeat)},
+            {"board": size, "query": "around(8)", "ms": timed(lambda: index.around(*next(cycle), 8), args.repeat)},
+            {"board": size, "query": "mid boundary movables",
+             "ms": timed(lambda: index.region(mid, 0, mid + 1, size, [Tile.movable]), args.repeat)},
+            {"board": size, "query": "nearest goal", "ms": timed(lambda: index.nearest(Tile.goal, *next(cycle)), args.repeat)},
+            {"board": size, "query": "set_tile", "ms": timed(lambda: index.set_tile(*next(cycle), Tile.movable), args.repeat)},
+            {"board": size, "query": "flood_fill", "ms": timed(lambda: index.flood_fill(*next(cycle)), 5)},
+        ]
+    print_table(results, ["board", "query", "ms"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Start up, step and draw cost of levels streamed from chunked files against PymunkLevel holding the whole level,
+while players walk one tile per step across the world. Streamed cost should follow the loaded area, not world size.
+"""
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import pygame as pg
+
+from . import print_table
+from game_jams.engine.scene_tools import percentiles
+from game_jams.jam_1.levels.chunked_level import load_chunked, write_chunked_level
+from game_jams.jam_1.levels.convert_level import PymunkLevel
+from game_jams.jam_1.levels.generate import generate_level
+from game_jams.jam_1.levels.streaming_level import StreamingLevel
+
+
+def walk(level: PymunkLevel, steps: int) -> list[float]:
+    """
+    Move every player a tile right each step, back to the left edge once it reaches the right one.
+    """
+    width = level.raw_level.level_info.width * 32
+    step_times = []
+    for _ in range(steps):
+        for shape in level.players:
+            body = shape.body
+            body.position += (32, 0) if shape.bb.right < width - 96 else (64 - shape.bb.left, 0)
+            body.activate()
+        start = time.perf_counter()
+        level.step()
+        step_times.append(time.perf_counter() - start)
+    return step_times
+
+
+def draw_time(level: PymunkLevel, frames: int = 20) -> float:
+    screen = pg.Surface((800, 800))
+    level.set_pygame_screen(screen)
+    frame_times = []
+    for _ in range(frames):
+        level.renderer.follow_players(1 / 60)
+        start = time.perf_counter()
+        level.draw()
+        frame_times.append(time.perf_counter() - start)
+    return percentiles(frame_times, 50)[0]
+
+
+def measure(name: str, size: int, make_level, steps: int) -> dict:
+    start = time.perf_counter()
+    level = make_level()
+    start_time = time.perf_counter() - start
+    step_times = walk(level, steps)
+    p50, p99 = percentiles(step_times, 50, 99)
+    result = {
+        "level": f"{name} {size}",
+        "start_ms": start_time * 1000,
+        "step_p50_ms": p50 * 1000,
+        "step_p99_ms": p99 * 1000,
+        "step_max_ms": max(step_times) * 1000,
+        "shapes": sum(len(space.shapes) for space in level.spaces),
+        "draw_ms": draw_time(level) * 1000,
+    }
+    if isinstance(level, StreamingLevel):
+        result.update(chunks=len(level.loaded), loads=level.loads, decoded_kb=level.raw_level.cached_bytes // 1024)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[256, 1024, 4096])
+    parser.add_argument("--chunk-size", type=int, default=64)
+    parser.add_argument("--steps", type=int, default=300)
+    parser.add_argument("--full-up-to", type=int, default=1024,
+                        help="largest size also run as a whole PymunkLevel")
+    args = parser.parse_args()
+
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        for size in args.sizes:
+            start = time.perf_counter()
+            raw_level = generate_level(size, seed=size)
+            generated = time.perf_counter() - start
+            path = Path(directory) / f"world_{size}.lvlc"
+            start = time.perf_counter()
+            write_chunked_level(raw_level, path, args.chunk_size)
+            print(f"{size}x{size}: generated in {generated:.1f} s, written in {time.perf_counter() - start:.1f} s, "
+                  f"{path.stat().st_size / 1024:.0f} KiB")
+            if size <= args.full_up_to:
+                results.append(measure("whole", size, lambda: PymunkLevel(raw_level), args.steps))
+            del raw_level
+            results.append(measure("streamed", size, lambda: StreamingLevel(load_chunked(path)), args.steps))
+    print_table(results, ["level", "start_ms", "step_p50_ms", "step_p99_ms", "step_max_ms", "shapes", "draw_ms",
+                          "chunks", "loads", "decoded_kb"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+"""
+Menu style text drawing with font.render every frame against TextCache.
+"""
+from __future__ import annotations
+
+import argparse
+import time
+
+import pygame as pg
+
+from . import print_table
+from game_jams.engine import TextCache
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--labels", type=int, default=100)
+    parser.add_argument("--frames", type=int, default=100)
+    args = parser.parse_args()
+
+    pg.font.init()
+    font = pg.font.Font(None, 30)
+    surface = pg.Surface((800, 800))
+    labels = [str(num) for num in range(args.labels)] + ["Level Selection", "Press Enter to start"]
+    cache = TextCache()
+
+    results = []
+    for name, render in (("font.render", font.render), ("TextCache", lambda *a: cache.render(font, *a))):
+        start = time.perf_counter()
+        for _ in range(args.frames):
+            for label in labels:
+                surface.blit(render(label, True, (255, 255, 255)), (0, 0))
+        results.append({"text": name, "frame_ms": (time.perf_counter() - start) * 1000 / args.frames})
+    print_table(results, ["text", "frame_ms"])
+    print(cache.stats())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""
+Time parse_raw, populate_space, tick and draw on generated levels of growing size tiers.
+Results are appended as JSON lines to --results and compared with the previous run of each tier,
+changes slower than --threshold are flagged (and fail the run with --check).
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+from random import Random
+
+import pygame as pg
+
+from . import load_results, print_table, record_results
+from game_jams.engine.scene_tools import percentiles
+from game_jams.jam_1.levels.convert_level import PymunkLevel
+from game_jams.jam_1.levels.generate import generate_level, write_level
+from game_jams.jam_1.levels.raw_level import RawLevel, parse_text
+
+tiers = {"small": 32, "medium": 128, "large": 512, "huge": 2048}
+# metrics compared between runs, all of them times where lower is better
+metrics = ["parse_ms", "populate_ms", "tick_p50_us", "tick_p99_us", "draw_p50_ms"]
+# contacts are counted outside the timed tick, every this many ticks
+contact_sample_every = 10
+default_results = Path(__file__).parent / "results" / "tiers.jsonl"
+
+
+def best_of(repeat: int, func) -> tuple[float, object]:
+    """
+    Shortest of repeat timed calls, with the result of the last one.
+    """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        times.append(time.perf_counter() - start)
+    return min(times), result
+
+
+def contact_count(level: PymunkLevel) -> int:
+    """
+    Contacts between shapes of the level right now, each counted once.
+    """
+    arbiters = set()
+    for bodies in level.dynamic_bodies:
+        for body in bodies:
+            body.each_arbiter(lambda arbiter: arbiters.add(arbiter.shapes))
+    return len(arbiters)
+
+
+def read_csv_rows(path: Path) -> tuple[list[str], list[list[str]], list[list[str]]]:
+    with path.open() as f:
+        info = parse_text(f.readline().rstrip("\n"))[0]
+        upper, lower = f.read().split("\n!\n")
+    return info, parse_text(upper), parse_text(lower)
+
+
+def measure_tier(tier: str, size: int, seed: int, steps: int, frames: int, repeat: int) -> dict:
+    raw_level = generate_level(size, seed=seed)
+    with tempfile.TemporaryDirectory() as directory:
+        info, upper, lower = read_csv_rows(write_level(raw_level, Path(directory) / "level.csv"))
+    parse_time, _ = best_of(repeat, lambda: RawLevel.parse_raw(info, upper, lower))
+    populate_time, level = best_of(repeat, lambda: PymunkLevel(raw_level))
+
+    # movables and players pushed in random directions, nothing slows them down in open space, so ticks keep
+    # moving bodies and solve contacts where they run into walls, the boundaries and each other
+    rng = Random(seed)
+    for bodies in level.dynamic_bodies:
+        for body in bodies:
+            body.velocity = (rng.uniform(-200, 200), rng.uniform(-200, 200))
+    tick_times, contacts = [], []
+    for step in range(steps):
+        start = time.perf_counter()
+        level.tick(level.timestep.step)
+        tick_times.append(time.perf_counter() - start)
+        if step % contact_sample_every == 0:
+            contacts.append(contact_count(level))
+    tick_p50, tick_p99 = percentiles(tick_times, 50, 99)
+
+    level.set_pygame_screen(pg.Surface((800, 800)))
+    frame_times = []
+    for _ in range(frames):
+        level.follow_players(1 / 60)
+        start = time.perf_counter()
+        level.draw()
+        frame_times.append(time.perf_counter() - start)
+    return {
+        "tier": tier,
+        "size": size,
+        "shapes": sum(len(space.shapes) for space in level.spaces),
+        "contacts": sum(contacts) / len(contacts) if contacts else 0.0,
+        "awake": level.awake_bodies(),
+        "parse_ms": parse_time * 1000,
+        "populate_ms": populate_time * 1000,
+        "tick_p50_us": tick_p50 * 1e6,
+        "tick_p99_us": tick_p99 * 1e6,
+        "draw_p50_ms": percentiles(frame_times, 50)[0] * 1000,
+    }
+
+
+def compare(previous: dict, current: dict, threshold: float) -> list[dict]:
+    rows = []
+    for metric in metrics:
+        before, after = previous.get(metric), current[metric]
+        if not before:
+            continue
+        change = after / before - 1
+        rows.append({
+            "tier": current["tier"],
+            "metric": metric,
+            "before": before,
+            "after": after,
+            "change_%": change * 100,
+            "flag": "slower" if change > threshold else "",
+        })
+    return rows
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tiers", nargs="+", choices=list(tiers), default=["small", "medium", "large"])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--steps", type=int, default=600)
+    parser.add_argument("--frames", type=int, default=60)
+    parser.add_argument("--repeat", type=int, default=3, help="runs of parse and populate, the best one counts")
+    parser.add_argument("--results", type=Path, default=default_results)
+    parser.add_argument("--no-record", action="store_true", help="compare only, do not append this run")
+    parser.add_argument("--threshold", type=float, default=0.2, help="relative slowdown flagged as a regression")
+    parser.add_argument("--check", action="store_true", help="exit with status 1 when a metric is flagged")
+    args = parser.parse_args()
+
+    previous = {}
+    for record in load_results(args.results, "tiers"):
+        if record.get("seed") == args.seed:
+            previous[record["tier"]] = record
+
+    results = [measure_tier(tier, tiers[tier], args.seed, args.steps, args.frames, args.repeat) for tier in args.tiers]
+    print_table(results, ["tier", "size", "shapes", "contacts", "awake"] + metrics)
+    if not args.no_record:
+        record_results(args.results, "tiers", results, seed=args.seed, steps=args.steps, frames=args.frames)
+
+    changes = [row for result in results if result["tier"] in previous
+               for row in compare(previous[result["tier"]], result, args.threshold)]
+    if changes:
+        revisions = sorted({previous[row["tier"]]["revision"] or "?" for row in changes})
+        print(f"\nChange against previous run ({', '.join(revisions)}):")
+        print_table(changes, ["tier", "metric", "before", "after", "change_%", "flag"])
+    flagged = [row for row in changes if row["flag"]]
+    return 1 if args.check and flagged else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
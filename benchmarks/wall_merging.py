@@ -0,0 +1,49 @@
+"""
+Compare per-tile wall colliders against merged rectangles on generated levels.
+"""
+from __future__ import annotations
+
+import argparse
+import math
+import time
+
+from . import print_table
+from game_jams.jam_1.levels.convert_level import PymunkLevel
+from game_jams.jam_1.levels.generate import generate_level
+from game_jams.engine.scene_tools import percentiles
+
+
+def measure(raw_level, merge_walls: bool, steps: int) -> dict:
+    start = time.perf_counter()
+    # bodies kept awake, a resting level would skip its steps and hide what walls cost
+    level = PymunkLevel(raw_level, merge_walls=merge_walls, sleep_time=math.inf)
+    build_time = time.perf_counter() - start
+    step_times = []
+    for _ in range(steps):
+        start = time.perf_counter()
+        level.step()
+        step_times.append(time.perf_counter() - start)
+    p50, p99 = percentiles(step_times, 50, 99)
+    return {
+        "mode": "merged" if merge_walls else "per tile",
+        "shapes": len(level.space.shapes),
+        "build_ms": build_time * 1000,
+        "step_p50_us": p50 * 1e6,
+        "step_p99_us": p99 * 1e6,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", type=int, default=256)
+    parser.add_argument("--steps", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    raw_level = generate_level(args.size, seed=args.seed)
+    print_table([measure(raw_level, False, args.steps), measure(raw_level, True, args.steps)],
+                ["mode", "shapes", "build_ms", "step_p50_us", "step_p99_us"])
+
+
+if __name__ == "__main__":
+    main()
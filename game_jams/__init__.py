@@ -1,3 +1,52 @@
-from . import jam_1
+"""
+Registry of the jams. Entries only name the module and function that start a jam, so listing them
+imports nothing; a jam and the engine are imported when it is started.
+Installed packages can add jams through the "game_jams" entry point group.
+"""
+from __future__ import annotations
 
-game_jams = [jam_1.main]
+import importlib
+import time
+from collections.abc import Callable
+
+
+class JamEntry:
+    def __init__(self, title: str, module: str, function: str = "main"):
+        self.title = title
+        self.module = module
+        self.function = function
+        self.import_time: float | None = None
+
+    def load(self) -> Callable[..., object]:
+        """
+        Import jam module and return its entry function, import_time is set the first time.
+        """
+        start = time.perf_counter()
+        module = importlib.import_module(self.module)
+        if self.import_time is None:
+            self.import_time = time.perf_counter() - start
+        return getattr(module, self.function)
+
+    def __call__(self, *args, **kwargs):
+        return self.load()(*args, **kwargs)
+
+    def __repr__(self):
+        return f"JamEntry({self.title!r}, {self.module!r}, {self.function!r})"
+
+
+def installed_jams() -> list[JamEntry]:
+    """
+    Jams registered by installed packages, as "name = package.module:function" entry points.
+    """
+    from importlib.metadata import entry_points
+
+    return [JamEntry(entry.name, entry.module, entry.attr or "main") for entry in entry_points(group="game_jams")]
+
+
+game_jams: list[JamEntry] = [
+    JamEntry("Top and Bottom", "game_jams.jam_1"),
+]
+
+
+def all_jams() -> list[JamEntry]:
+    return game_jams + installed_jams()
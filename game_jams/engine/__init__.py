@@ -1,5 +1,11 @@
 from .base_scene import SceneManager, Scene as BaseScene
+from .text_cache import TextCache
+from .assets import AssetManager
+from .profiler import FrameProfiler
+from .loader import BackgroundLoader, LoadTask
+from .replay import InputRecorder, InputReplay, ReplayResult
 from .window import *
 
 scene_manager = SceneManager()
+text_cache = TextCache()
 del SceneManager
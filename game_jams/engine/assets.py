@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Iterable
+
+import pygame as pg
+
+from .loader import BackgroundLoader, LoadTask
+
+
+class AssetManager:
+    """
+    Named surfaces, loaded from files under root or baked by a function, on first use or preloaded in the background.
+    Surfaces loaded before the display exists are converted to its pixel format on first use after it does,
+    or all at once by convert_all(). Scaled variants are kept in a least recently used cache bounded by bytes.
+    """
+
+    def __init__(self, root: Path | None = None, loader: BackgroundLoader | None = None,
+                 max_scaled_bytes: int = 32 * 1024 * 1024):
+        self.root = root
+        self.loader = loader
+        self.max_scaled_bytes = max_scaled_bytes
+        self._sources: dict[str, tuple[Path | Callable[[], pg.Surface], bool]] = {}
+        self._surfaces: dict[str, pg.Surface] = {}
+        self._converted: set[str] = set()
+        self._scaled: OrderedDict[tuple[str, tuple[int, int]], pg.Surface] = OrderedDict()
+        self.scaled_bytes = 0
+        self._fonts: dict[tuple[str | None, int], pg.font.Font] = {}
+        # preloading fills surfaces from loader threads
+        self._lock = threading.RLock()
+
+    def register(self, name: str, source: str | Path | Callable[[], pg.Surface], alpha: bool = True):
+        """
+        Declare an asset without loading it, source is a file path relative to root or a function baking the surface.
+        alpha assets are converted with convert_alpha, others with convert.
+        """
+        if isinstance(source, str):
+            source = Path(source)
+        with self._lock:
+            self._sources[name] = (source, alpha)
+            self.unload(name)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._sources
+
+    def _load(self, name: str) -> pg.Surface:
+        source, _ = self._sources[name]
+        if isinstance(source, Path):
+            return pg.image.load(source if self.root is None else self.root / source)
+        return source()
+
+    def get(self, name: str) -> pg.Surface:
+        """
+        Surface of asset name, in display pixel format once the display exists.
+        Returned surface is shared, do not draw on it.
+        """
+        with self._lock:
+            surface = self._surfaces.get(name)
+        if surface is None:
+            surface = self._load(name)
+            with self._lock:
+                surface = self._surfaces.setdefault(name, surface)
+        if name not in self._converted and pg.display.get_surface() is not None:
+            surface = self._convert(name, surface)
+        return surface
+
+    def _convert(self, name: str, surface: pg.Surface) -> pg.Surface:
+        _, alpha = self._sources[name]
+        surface = surface.convert_alpha() if alpha else surface.convert()
+        with self._lock:
+            self._surfaces[name] = surface
+            self._converted.add(name)
+        return surface
+
+    def convert_all(self):
+        """
+        Convert every loaded surface, call once the display exists (after GameState.init).
+        """
+        with self._lock:
+            pending = [(name, surface) for name, surface in self._surfaces.items() if name not in self._converted]
+        for name, surface in pending:
+            self._convert(name, surface)
+
+    def preload(self, names: Iterable[str] | None = None) -> LoadTask | None:
+        """
+        Load assets (every registered one by default) on the background loader, without converting them.
+        Without a loader they are loaded right away and None is returned.
+        """
+        names = sorted(self._sources if names is None else names)
+
+        def prepare(task: LoadTask | None = None):
+            for index, name in enumerate(names):
+                with self._lock:
+                    loaded = name in self._surfaces
+                if not loaded:
+                    surface = self._load(name)
+                    with self._lock:
+                        self._surfaces.setdefault(name, surface)
+                if task is not None:
+                    task.report((index + 1) / len(names))
+            return names
+
+        if self.loader is None:
+            prepare()
+            return None
+        return self.loader.load(("assets", tuple(names)), prepare)
+
+    def scaled(self, name: str, size: tuple[int, int], smooth: bool = True) -> pg.Surface:
+        """
+        Asset scaled to size, cached so it is scaled only once.
+        """
+        key = (name, tuple(size))
+        with self._lock:
+            surface = self._scaled.get(key)
+            if surface is not None:
+                self._scaled.move_to_end(key)
+                return surface
+        source = self.get(name)
+        if smooth and source.get_bytesize() in (3, 4):
+            surface = pg.transform.smoothscale(source, size)
+        else:
+            surface = pg.transform.scale(source, size)
+        with self._lock:
+            self._scaled[key] = surface
+            self.scaled_bytes += surface_bytes(surface)
+            while self.scaled_bytes > self.max_scaled_bytes and len(self._scaled) > 1:
+                _, evicted = self._scaled.popitem(last=False)
+                self.scaled_bytes -= surface_bytes(evicted)
+        return surface
+
+    def font(self, name: str | Path | None, size: int) -> pg.font.Font:
+        """
+        Font file under root (None for pygame's default font) at size, created on first use.
+        """
+        key = (None if name is None else str(name), size)
+        font = self._fonts.get(key)
+        if font is None:
+            if not pg.font.get_init():
+                pg.font.init()
+            path = None if name is None else (Path(name) if self.root is None else self.root / name)
+            font = self._fonts[key] = pg.font.Font(path, size)
+        return font
+
+    def unload(self, name: str):
+        """
+        Forget loaded surface and scaled variants of name, it is loaded again when used.
+        """
+        with self._lock:
+            self._surfaces.pop(name, None)
+            self._converted.discard(name)
+            for key in [key for key in self._scaled if key[0] == name]:
+                self.scaled_bytes -= surface_bytes(self._scaled.pop(key))
+
+    def memory_report(self) -> dict[str, int | dict[str, int]]:
+        with self._lock:
+            sizes = {name: surface_bytes(surface) for name, surface in self._surfaces.items()}
+            return {
+                "registered": len(self._sources),
+                "loaded": len(sizes),
+                "converted": len(self._converted),
+                "bytes": sum(sizes.values()),
+                "scaled": len(self._scaled),
+                "scaled_bytes": self.scaled_bytes,
+                "fonts": len(self._fonts),
+                "by_asset": sizes,
+            }
+
+
+def surface_bytes(surface: pg.Surface) -> int:
+    return surface.get_width() * surface.get_height() * surface.get_bytesize()
+
+
+__all__ = ["AssetManager"]
@@ -1,6 +1,9 @@
 from __future__ import annotations
 
-from typing import Type
+import tracemalloc
+import weakref
+import zlib
+from typing import Any, Callable, Iterable, Type
 
 import pygame as pg
 
@@ -13,23 +16,36 @@ class SceneException(Exception):
 
 
 class Scene:
-    _instances_cnt: int = -1
-    instances: dict[int, Scene] = {}
-
     _scenes_cnt = -1
     scenes: dict[int, Type[Scene]] = {}
 
     class_id: int = -1
 
+    # Scenes that repaint the whole surface every frame keep this True.
+    # Others return list of changed rects from draw and get needs_full_redraw set when they have to repaint all.
+    full_redraw: bool = True
+
     manager: SceneManager | None
     frame_counter: FrameCounter
 
     def __init__(self, scene_manager: SceneManager):
         self.manager = scene_manager
-        Scene._instances_cnt += 1
-        Scene.instances[self._instances_cnt] = self
-        self.instance_id = self.current_instance_id()
         self._events: list[pg.event.Event] = []
+        # event type -> key (None for every event of that type) -> handlers
+        self._handlers: dict[int, dict[int | None, list[Callable[[pg.event.Event], Any]]]] = {}
+        self.reuse()
+
+    def reuse(self):
+        """
+        Register scene with its manager under a new instance id and bring it to the state of a freshly created one.
+        Used for new scenes and for scenes taken back out of the manager's pool.
+        """
+        self.instance_id = self.manager.register(self)
+        self._events.clear()
+        self._handlers.clear()
+        self.needs_full_redraw = True
+        self.suspended = False
+        self.disposed = False
         self.frame_counter = FrameCounter(self.manager.game.max_fps)
         self.init()
 
@@ -38,10 +54,6 @@ class Scene:
         Scene.scenes[Scene._scenes_cnt] = cls
         cls.class_id = cls.current_class_id()
 
-    @classmethod
-    def current_instance_id(cls):
-        return Scene._instances_cnt
-
     @classmethod
     def current_class_id(cls):
         return Scene._scenes_cnt
@@ -49,17 +61,48 @@ class Scene:
     def init(self, *args, **kwargs):
         pass
 
+    def bind(self, event_type: int, handler: Callable[[pg.event.Event], Any], key: int | None = None):
+        """
+        Call handler for events of event_type, only for those with given key when key is passed.
+        Bind add_event_to_pool to collect events for get_events instead.
+        """
+        self._handlers.setdefault(event_type, {}).setdefault(key, []).append(handler)
+
+    def bind_keys(self, event_type: int, keys: Iterable[int], handler: Callable[[pg.event.Event], Any]):
+        for key in keys:
+            self.bind(event_type, handler, key)
+
+    def unbind(self, event_type: int, handler: Callable[[pg.event.Event], Any], key: int | None = None):
+        handlers = self._handlers.get(event_type, {}).get(key, [])
+        if handler in handlers:
+            handlers.remove(handler)
+
     def add_event_to_pool(self, event: pg.event.Event):
         self._events.append(event)
 
     def on_event(self, event: pg.event.Event):
-        pass
+        """
+        Route event to handlers bound for its type and key, events of unbound types are dropped right away.
+        """
+        by_key = self._handlers.get(event.type)
+        if by_key is None:
+            return
+        key = event.dict.get("key")
+        if key is not None and key in by_key:
+            for handler in by_key[key]:
+                handler(event)
+        if None in by_key:
+            for handler in by_key[None]:
+                handler(event)
 
     def get_events(self):
-        for _ in range(len(self._events)):
-            yield self._events.pop()
+        """
+        Drain pooled events in the order they arrived.
+        """
+        events, self._events = self._events, []
+        yield from events
 
-    def draw(self, surface: pg.Surface):
+    def draw(self, surface: pg.Surface) -> list[pg.Rect] | None:
         pass
 
     def update(self, delta_time: float):
@@ -71,75 +114,187 @@ class Scene:
     def on_redirect_from(self, scene: Scene):
         pass
 
+    def checksum(self) -> int:
+        """
+        Hash of state that input can change, replays compare it frame by frame.
+        """
+        return 0
+
+    def on_suspend(self):
+        """
+        Called when scene stops being the active one, but may come back.
+        """
+
+    def on_resume(self):
+        """
+        Called when suspended scene becomes active again.
+        """
+
+    def dispose(self):
+        """
+        Release heavy resources, scene is removed or waits in pool until reuse calls init again.
+        """
+
 
 class SceneManager:
     game: GameState
     global_counter: FrameCounter
 
-    def __init__(self):
+    def __init__(self, pool_size: int = 1):
         self.current: Scene | None = None
         self.initialised = False
+        # Only the manager keeps scenes alive (current scene and pool), plus whatever scenes reference each other.
+        self.instances: weakref.WeakValueDictionary[int, Scene] = weakref.WeakValueDictionary()
+        self._instances_cnt = -1
+        # disposed scenes kept for reuse, at most pool_size per class
+        self.pool_size = pool_size
+        self.pool: dict[Type[Scene], list[Scene]] = {}
+
+    def register(self, scene: Scene) -> int:
+        """
+        Give scene a new instance id, unique within this manager.
+        """
+        self._instances_cnt += 1
+        self.instances[self._instances_cnt] = scene
+        return self._instances_cnt
+
+    def current_instance_id(self) -> int:
+        return self._instances_cnt
 
     def init_check(self):
         if not self.initialised:
             raise SceneException("SceneManager not initialised")
 
-    def draw(self, surface: pg.Surface):
+    @property
+    def full_redraw(self) -> bool:
+        """
+        Whether next draw repaints the whole surface.
+        """
+        return self.current is None or self.current.full_redraw or self.current.needs_full_redraw
+
+    def draw(self, surface: pg.Surface) -> list[pg.Rect] | None:
+        """
+        Draw current scene, returns changed rects or None when whole surface changed.
+        """
         self.init_check()
-        if self.current is not None:
-            self.current.draw(surface)
+        if self.current is None:
+            return None
+        full = self.full_redraw
+        self.game.profiler.start("draw")
+        rects = self.current.draw(surface)
+        self.game.profiler.stop("draw")
+        self.current.needs_full_redraw = False
+        if full:
+            return None
+        return list(rects or ())
 
     def update(self, delta_time: float):
         self.init_check()
         if self.current:
+            self.game.profiler.start("update")
             self.current.update(delta_time)
             self.current.frame_counter.tick(delta_time)
+            self.game.profiler.stop("update")
 
-    def set_active_scene(self, scene_id: int | Scene, silent: bool = False):
+    def set_active_scene(self, scene_id: int | Scene, silent: bool = False, release: bool = False):
+        """
+        Make scene the active one, the previous one is suspended, or released to the pool with release.
+        """
         if isinstance(scene_id, Scene):
-            if self.current:
-                self.current.on_redirect(scene_id)
-            old = self.current
-            self.current = scene_id
-            if not silent:
-                self.current.on_redirect_from(old)
-        elif scene_id in Scene.instances:
-            old = self.current
-            new = Scene.instances[scene_id]
-            if not silent:
-                new.on_redirect_from(old)
-            if self.current:
-                self.current.on_redirect(new)
-            self.current = new
-
-    def spawn_scene(self, scene_id: int | Type[Scene], silent: bool = False):
+            new = scene_id
+        elif scene_id in self.instances:
+            new = self.instances[scene_id]
+        else:
+            return
+        old = self.current
+        if old:
+            old.on_redirect(new)
+            old.suspended = True
+            old.on_suspend()
+        self.current = new
+        new.needs_full_redraw = True
+        if new.suspended:
+            new.suspended = False
+            new.on_resume()
+        if not silent:
+            new.on_redirect_from(old)
+        if release and old is not None and old is not self.current:
+            self.release_scene(old)
+
+    def spawn_scene(self, scene_id: int | Type[Scene], silent: bool = False, release: bool = False):
         if isinstance(scene_id, type) and issubclass(scene_id, Scene):
-            return self.spawn_scene(scene_id.class_id)
+            return self.spawn_scene(scene_id.class_id, silent, release)
         elif scene_id in Scene.scenes:
-            Scene.scenes[scene_id](self)
-            self.set_active_scene(Scene.current_instance_id(), silent)
-            return Scene.current_instance_id()
+            scene_class = Scene.scenes[scene_id]
+            pooled = self.pool.get(scene_class)
+            if pooled:
+                scene = pooled.pop()
+                scene.reuse()
+            else:
+                scene = scene_class(self)
+            self.set_active_scene(scene, silent, release)
+            return scene.instance_id
         else:
             raise SceneException("Scene not found.")
 
     def spawn_remove_scene(self, scene_id: int | Type[Scene]):
-        self.remove_scene(Scene.current_instance_id())
+        self.remove_scene(self.current_instance_id())
         self.spawn_scene(scene_id)
 
+    def release_scene(self, scene: Scene):
+        """
+        Dispose scene and keep it in the pool for reuse if there is room.
+        """
+        self.remove_scene(scene)
+        pooled = self.pool.setdefault(type(scene), [])
+        if len(pooled) < self.pool_size:
+            pooled.append(scene)
+
     def remove_scene(self, scene_id: int | Scene):
         if isinstance(scene_id, Scene):
-            scene_id = scene_id.instance_id
-        if scene_id in Scene.instances:
-            del Scene.instances[scene_id]
-            if self.current and scene_id == self.current.instance_id:
-                self.current = None
+            scene = scene_id
+        else:
+            scene = self.instances.get(scene_id)
+        if scene is None or scene.disposed:
+            return
+        self.instances.pop(scene.instance_id, None)
+        if self.current is scene:
+            self.current = None
+        scene.disposed = True
+        scene.dispose()
+
+    def checksum(self) -> int:
+        """
+        Checksum of the current scene, including which scene it is.
+        """
+        if self.current is None:
+            return 0
+        name = zlib.crc32(type(self.current).__name__.encode())
+        return zlib.crc32((self.current.checksum() & 0xFFFFFFFFFFFFFFFF).to_bytes(8, "little"), name)
+
+    def memory_report(self) -> dict[str, dict[str, int]]:
+        """
+        Live, suspended and pooled scenes per class, plus traced memory when tracemalloc is running.
+        """
+        ret: dict[str, dict[str, int]] = {}
+        for scene in list(self.instances.values()):
+            counts = ret.setdefault(type(scene).__name__, {"live": 0, "suspended": 0, "pooled": 0})
+            counts["live"] += 1
+            counts["suspended"] += scene.suspended
+        for scene_class, pooled in self.pool.items():
+            counts = ret.setdefault(scene_class.__name__, {"live": 0, "suspended": 0, "pooled": 0})
+            counts["pooled"] += len(pooled)
+        if tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            ret["tracemalloc"] = {"current": current, "peak": peak}
+        return ret
 
     def handle_events(self, event: pg.event.Event):
-        self.current.add_event_to_pool(event)
         self.current.on_event(event)
 
     def init(self, game: GameState, *args, **kwargs):
         self.game = game
+        game.scene_manager = self
         self.global_counter = FrameCounter(self.game.max_fps)
         self.initialised = True
 
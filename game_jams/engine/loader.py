@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Hashable
+
+
+class LoadTask:
+    """
+    Handle of a resource prepared on the loader thread, the preparing function reports progress through it.
+    """
+
+    def __init__(self, key: Hashable):
+        self.key = key
+        self.progress = 0.0
+        self.future: Future | None = None
+
+    def report(self, progress: float):
+        self.progress = progress
+
+    def done(self) -> bool:
+        return self.future is not None and self.future.done()
+
+    def result(self, timeout: float | None = None) -> Any:
+        """
+        Prepared resource, blocks until it is ready. Raises exception of the preparing function.
+        """
+        return self.future.result(timeout)
+
+    def exception(self) -> BaseException | None:
+        return self.future.exception() if self.done() else None
+
+
+class BackgroundLoader:
+    """
+    Runs heavy preparation (parsing, building spaces, pre-rendering) on worker threads.
+    Tasks are remembered by key, so a prefetched resource is picked up instead of being prepared again.
+    At most max_cached tasks are kept, oldest are cancelled or forgotten first.
+    """
+
+    def __init__(self, max_workers: int = 1, max_cached: int = 4, synchronous: bool = False):
+        self.max_workers = max_workers
+        self.max_cached = max_cached
+        # prepare on the calling thread, for runs that have to be deterministic (recording, replays)
+        self.synchronous = synchronous
+        self._executor: ThreadPoolExecutor | None = None
+        self._tasks: OrderedDict[Hashable, LoadTask] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(self.max_workers, thread_name_prefix="loader")
+        return self._executor
+
+    def load(self, key: Hashable, prepare: Callable[[LoadTask], Any]) -> LoadTask:
+        """
+        Task for key, prepare(task) is submitted only when there is no task for key yet.
+        """
+        with self._lock:
+            task = self._tasks.get(key)
+            if task is not None:
+                self._tasks.move_to_end(key)
+                return task
+            task = LoadTask(key)
+            if self.synchronous:
+                task.future = Future()
+                try:
+                    task.future.set_result(prepare(task))
+                except Exception as e:
+                    task.future.set_exception(e)
+            else:
+                task.future = self.executor.submit(prepare, task)
+            self._tasks[key] = task
+            while len(self._tasks) > self.max_cached:
+                _, old = self._tasks.popitem(last=False)
+                old.future.cancel()
+        return task
+
+    prefetch = load
+
+    def pop(self, key: Hashable) -> LoadTask | None:
+        """
+        Forget task, the next load of key prepares a fresh resource.
+        """
+        with self._lock:
+            return self._tasks.pop(key, None)
+
+    def shutdown(self):
+        with self._lock:
+            for task in self._tasks.values():
+                task.future.cancel()
+            self._tasks.clear()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+__all__ = ["BackgroundLoader", "LoadTask"]
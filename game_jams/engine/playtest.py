@@ -0,0 +1,97 @@
+"""
+Automated playtesting: headless games fed random key presses, run side by side on a process pool.
+"""
+from __future__ import annotations
+
+import importlib
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from random import Random
+from typing import Sequence
+
+import pygame as pg
+
+
+class PlaytestResult:
+    def __init__(self, seed: int):
+        self.seed = seed
+        self.frames = 0
+        self.presses = 0
+        self.elapsed = 0.0
+        self.scene = ""
+        self.checksum: int | None = None
+        self.error: str | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    @property
+    def frames_per_second(self) -> float:
+        return self.frames / self.elapsed if self.elapsed else 0.0
+
+    def as_dict(self) -> dict[str, int | float | str | None]:
+        return {
+            "seed": self.seed,
+            "frames": self.frames,
+            "presses": self.presses,
+            "fps": self.frames_per_second,
+            "scene": self.scene,
+            "checksum": self.checksum,
+            "error": self.error.strip().splitlines()[-1] if self.error else "-",
+        }
+
+
+def load_factory(factory: str):
+    """
+    Function named by "package.module:function".
+    """
+    module, _, name = factory.partition(":")
+    return getattr(importlib.import_module(module), name)
+
+
+def playtest(factory: str, seed: int, frames: int, keys: Sequence[int], press_rate: float = 0.1,
+             delta_time: float = 1 / 60) -> PlaytestResult:
+    """
+    Run one headless game made by factory(headless=True) for frames frames, pressing a random one of keys
+    with press_rate chance each frame. Stops early when the game stops itself, errors are caught into the result.
+    """
+    result = PlaytestResult(seed)
+    rng = Random(seed)
+    start = time.perf_counter()
+    try:
+        game = load_factory(factory)(headless=True)
+        game.init()
+        for _ in range(frames):
+            if rng.random() < press_rate:
+                game.post(pg.event.Event(pg.KEYDOWN, key=rng.choice(keys), mod=0, unicode="", scancode=0))
+                result.presses += 1
+            game.step(delta_time)
+            result.frames += 1
+            if not game.running:
+                break
+        result.checksum = game.checksum()
+        if game.scene_manager is not None and game.scene_manager.current is not None:
+            result.scene = type(game.scene_manager.current).__name__
+    except Exception:
+        result.error = traceback.format_exc()
+    result.elapsed = time.perf_counter() - start
+    return result
+
+
+def run_playtests(factory: str, seeds: Sequence[int], frames: int, keys: Sequence[int], press_rate: float = 0.1,
+                  workers: int | None = None) -> list[PlaytestResult]:
+    """
+    One playtest per seed across a process pool, results keep the order of seeds.
+    With workers=1 they run one after another in this process, each on its own game.
+    """
+    if workers == 1:
+        return [playtest(factory, seed, frames, keys, press_rate) for seed in seeds]
+    count = len(seeds)
+    with ProcessPoolExecutor(workers) as pool:
+        return list(pool.map(playtest, [factory] * count, seeds, [frames] * count, [keys] * count,
+                             [press_rate] * count))
+
+
+__all__ = ["PlaytestResult", "playtest", "run_playtests"]
@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+import time
+from collections import deque
+from pathlib import Path
+
+import pygame as pg
+
+from .scene_tools import percentiles
+
+
+def _noop(*args):
+    pass
+
+
+class FrameProfiler:
+    """
+    Times named sections of each frame and keeps the last frames in a ring buffer.
+    While disabled every method used in the frame loop is a no-op, so it can stay in production builds.
+    """
+
+    def __init__(self, fps: int, history: int = 600):
+        self.fps = fps
+        self.budget = 1 / fps if fps > 0 else 0.0
+        self.frames: deque[tuple[float, float, dict[str, float]]] = deque(maxlen=history)
+        self.enabled = False
+        self.show_overlay = False
+        # profiling was off when the overlay was shown, hiding it turns profiling off again
+        self._enabled_by_overlay = False
+        self.total_frames = 0
+        self.dropped_frames = 0
+        self._sections: dict[str, float] = {}
+        self._starts: dict[str, float] = {}
+        self._frame_start = 0.0
+        self._delta_time = 0.0
+        self._overlay: pg.Surface | None = None
+        self._overlay_time = 0.0
+        self._font: pg.font.Font | None = None
+        self.disable()
+
+    def enable(self):
+        self.enabled = True
+        self._sections = {}
+        self._frame_start = time.perf_counter()
+        self.begin_frame = self._begin_frame
+        self.end_frame = self._end_frame
+        self.start = self._start
+        self.stop = self._stop
+
+    def disable(self):
+        self.enabled = False
+        self.show_overlay = False
+        self._enabled_by_overlay = False
+        self.begin_frame = self.end_frame = self.start = self.stop = _noop
+
+    def toggle_overlay(self):
+        """
+        Show or hide overlay. When profiling was off it is turned on with the overlay and off again when
+        the overlay is hidden, a session profiled from the start keeps profiling.
+        """
+        if self.show_overlay:
+            self.show_overlay = False
+            if self._enabled_by_overlay:
+                self.disable()
+        else:
+            if not self.enabled:
+                self.enable()
+                self._enabled_by_overlay = True
+            self.show_overlay = True
+
+    def _begin_frame(self, delta_time: float):
+        self._sections = {}
+        self._delta_time = delta_time
+        self._frame_start = time.perf_counter()
+
+    def _end_frame(self):
+        frame_time = time.perf_counter() - self._frame_start
+        self.frames.append((self._delta_time, frame_time, self._sections))
+        self.total_frames += 1
+        # a frame arriving later than one and a half budgets missed its slot
+        if self.budget and self._delta_time > self.budget * 1.5:
+            self.dropped_frames += 1
+
+    def _start(self, section: str):
+        self._starts[section] = time.perf_counter()
+
+    def _stop(self, section: str):
+        started = self._starts.pop(section, None)
+        if started is None:
+            # profiling was turned on inside this section
+            return
+        elapsed = time.perf_counter() - started
+        self._sections[section] = self._sections.get(section, 0.0) + elapsed
+
+    def section_names(self) -> list[str]:
+        names = []
+        for _, _, sections in self.frames:
+            for name in sections:
+                if name not in names:
+                    names.append(name)
+        return names
+
+    def summary(self) -> dict[str, dict[str, float]]:
+        """
+        p50/p90/p99/max in milliseconds of whole frames and of each section, over the frames in history.
+        """
+        columns = {"frame": [frame_time for _, frame_time, _ in self.frames]}
+        for name in self.section_names():
+            columns[name] = [sections.get(name, 0.0) for _, _, sections in self.frames]
+        ret = {}
+        for name, samples in columns.items():
+            p50, p90, p99 = percentiles(samples, 50, 90, 99)
+            ret[name] = {"p50": p50 * 1000, "p90": p90 * 1000, "p99": p99 * 1000,
+                         "max": max(samples, default=0.0) * 1000}
+        return ret
+
+    def draw_overlay(self, surface: pg.Surface) -> pg.Rect | None:
+        """
+        Draw summary in top right corner, text is refreshed twice a second.
+        """
+        if not self.show_overlay:
+            return None
+        now = time.perf_counter()
+        if self._overlay is None or now - self._overlay_time > 0.5:
+            self._overlay = self.render_overlay()
+            self._overlay_time = now
+        rect = self._overlay.get_rect(topright=(surface.get_width(), 0))
+        return surface.blit(self._overlay, rect)
+
+    def render_overlay(self) -> pg.Surface:
+        if self._font is None:
+            if not pg.font.get_init():
+                pg.font.init()
+            self._font = pg.font.Font(None, 20)
+        lines = [f"frames {self.total_frames}  dropped {self.dropped_frames}"]
+        for name, stats in self.summary().items():
+            lines.append(f"{name:>8} p50 {stats['p50']:6.2f}  p99 {stats['p99']:6.2f}  max {stats['max']:6.2f}")
+        rendered = [self._font.render(line, True, (255, 255, 255), (0, 0, 0)) for line in lines]
+        overlay = pg.Surface((max(line.get_width() for line in rendered) + 8, len(rendered) * 16 + 8))
+        for index, line in enumerate(rendered):
+            overlay.blit(line, (4, 4 + index * 16))
+        return overlay
+
+    def dump(self, path: str | Path):
+        """
+        Write frames in history as csv, times in milliseconds.
+        """
+        names = self.section_names()
+        with Path(path).open("w") as f:
+            f.write(",".join(["delta_time", "frame"] + names) + "\n")
+            for delta_time, frame_time, sections in self.frames:
+                values = [delta_time, frame_time] + [sections.get(name, 0.0) for name in names]
+                f.write(",".join(f"{value * 1000:.4f}" for value in values) + "\n")
+
+
+__all__ = ["FrameProfiler"]
@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import gzip
+import json
+import struct
+from pathlib import Path
+from typing import Iterator
+
+import pygame as pg
+
+magic = b"JRPL"
+version = 2
+header_format = struct.Struct("<4sHH")  # magic, version, fps
+# after the header every frame is one line of json, [delta_time, [[type, attributes], ...], checksum]
+
+# event attributes that survive recording, anything else (window objects and such) is dropped
+_plain_types = (int, float, str, bool, type(None))
+
+
+def _plain(value) -> bool:
+    if isinstance(value, tuple):
+        return all(isinstance(item, _plain_types) for item in value)
+    return isinstance(value, _plain_types)
+
+
+def event_to_record(event: pg.event.Event) -> tuple[int, dict]:
+    return event.type, {name: value for name, value in event.dict.items() if _plain(value)}
+
+
+def record_to_event(record: tuple[int, dict]) -> pg.event.Event:
+    # json keeps tuples such as positions as lists
+    return pg.event.Event(record[0], {name: tuple(value) if isinstance(value, list) else value
+                                      for name, value in record[1].items()})
+
+
+class InputRecorder:
+    """
+    Writes frames as (delta_time, events, checksum) into a gzip compressed file, one json line each,
+    so recordings do not depend on the Python version and reading one runs no code from it.
+    """
+
+    def __init__(self, path: str | Path, fps: int):
+        self.path = Path(path)
+        self.file = gzip.open(self.path, "wb")
+        self.file.write(header_format.pack(magic, version, max(fps, 0)))
+        self.frames = 0
+
+    def record_frame(self, delta_time: float, events: list[pg.event.Event], checksum: int | None):
+        record = [delta_time, [event_to_record(event) for event in events], checksum]
+        self.file.write(json.dumps(record, separators=(",", ":")).encode() + b"\n")
+        self.frames += 1
+
+    def close(self):
+        self.file.close()
+
+
+class InputReplay:
+    """
+    Reads file written by InputRecorder.
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        with gzip.open(self.path, "rb") as f:
+            file_magic, file_version, self.fps = header_format.unpack(f.read(header_format.size))
+        if file_magic != magic or file_version != version:
+            raise ValueError(f"{self.path} is not a replay file of version {version}")
+
+    def __iter__(self) -> Iterator[tuple[float, list[pg.event.Event], int | None]]:
+        with gzip.open(self.path, "rb") as f:
+            f.read(header_format.size)
+            for line in f:
+                delta_time, events, checksum = json.loads(line)
+                yield delta_time, [record_to_event(event) for event in events], checksum
+
+
+class ReplayResult:
+    def __init__(self, path: Path):
+        self.path = path
+        self.frames = 0
+        self.elapsed = 0.0
+        self.divergences: list[tuple[int, int, int]] = []
+
+    @property
+    def first_divergence(self) -> int | None:
+        return self.divergences[0][0] if self.divergences else None
+
+    @property
+    def frames_per_second(self) -> float:
+        return self.frames / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def ok(self) -> bool:
+        return not self.divergences
+
+    def __str__(self):
+        status = "ok" if self.ok else f"DIVERGED at frame {self.first_divergence}"
+        return f"{self.path.name}: {self.frames} frames, {self.frames_per_second:.0f} fps, {status}"
+
+
+__all__ = ["InputRecorder", "InputReplay", "ReplayResult", "event_to_record", "record_to_event"]
@@ -1,3 +1,8 @@
+from __future__ import annotations
+
+from typing import Sequence
+
+
 class FrameCounter:
     def __init__(self, fps: int):
         self.fps = fps
@@ -23,4 +28,53 @@ class FrameCounter:
             self.new_minute = True
 
 
-__all__ = ["FrameCounter"]
+class FixedTimestep:
+    """
+    Accumulates variable frame time and hands it out as fixed size steps.
+    """
+
+    def __init__(self, step: float, max_substeps: int = 8):
+        self.step = step
+        self.max_substeps = max_substeps
+        self.accumulator = 0.0
+        self.steps = 0
+
+    def advance(self, delta_time: float) -> int:
+        """
+        Add delta_time to the accumulator and return how many fixed steps should run now.
+        Frame hitches longer than max_substeps steps are dropped instead of replayed.
+        """
+        self.accumulator += delta_time
+        count = int(self.accumulator / self.step)
+        if count > self.max_substeps:
+            count = self.max_substeps
+            self.accumulator = 0.0
+        else:
+            self.accumulator -= count * self.step
+        self.steps += count
+        return count
+
+    @property
+    def alpha(self) -> float:
+        """
+        Fraction of a step left in the accumulator, useful for interpolating drawing.
+        """
+        return self.accumulator / self.step
+
+    def reset(self):
+        self.accumulator = 0.0
+        self.steps = 0
+
+
+def percentiles(samples: Sequence[float], *qs: float) -> list[float]:
+    """
+    Nearest-rank percentiles (0-100) of samples.
+    """
+    if not samples:
+        return [0.0 for _ in qs]
+    ordered = sorted(samples)
+    last = len(ordered) - 1
+    return [ordered[min(last, max(0, round(q / 100 * last)))] for q in qs]
+
+
+__all__ = ["FrameCounter", "FixedTimestep", "percentiles"]
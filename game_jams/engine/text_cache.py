@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+
+import pygame as pg
+
+
+class TextCache:
+    """
+    Least recently used cache of rendered text surfaces, keyed by (font, text, antialias, color, background).
+    Bounded by both number of entries and total pixel bytes.
+    """
+
+    def __init__(self, max_entries: int = 512, max_bytes: int = 16 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._surfaces: OrderedDict[tuple, pg.Surface] = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def render(self, font: pg.font.Font, text: str, antialias: bool, color,
+               background=None) -> pg.Surface:
+        """
+        Same as font.render, but returns the cached surface when possible.
+        Returned surface is shared, do not draw on it.
+        """
+        key = (font, text, antialias, tuple(color), None if background is None else tuple(background))
+        surface = self._surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            self._surfaces.move_to_end(key)
+            return surface
+        self.misses += 1
+        surface = font.render(text, antialias, color, background)
+        self._surfaces[key] = surface
+        self.bytes += self.surface_bytes(surface)
+        while len(self._surfaces) > self.max_entries or (self.bytes > self.max_bytes and len(self._surfaces) > 1):
+            _, evicted = self._surfaces.popitem(last=False)
+            self.bytes -= self.surface_bytes(evicted)
+            self.evictions += 1
+        return surface
+
+    @staticmethod
+    def surface_bytes(surface: pg.Surface) -> int:
+        return surface.get_width() * surface.get_height() * surface.get_bytesize()
+
+    def clear(self):
+        self._surfaces.clear()
+        self.bytes = 0
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "entries": len(self._surfaces),
+            "bytes": self.bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+    def __len__(self) -> int:
+        return len(self._surfaces)
+
+
+__all__ = ["TextCache"]
@@ -1,26 +1,53 @@
 from __future__ import annotations
 
-from typing import Callable
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable
 from warnings import warn
 
 import pygame as pg
 
+from .loader import BackgroundLoader
+from .profiler import FrameProfiler
+from .replay import InputRecorder, InputReplay, ReplayResult
 
-pg.init()
+if TYPE_CHECKING:
+    from .base_scene import SceneManager
 
 
 class GameState:
+    """
+    One game: its screen, frame loop, input and loader. Any number of them can live in one process.
+    A headless game draws into an offscreen surface, never opens a window and gets input only through post(),
+    it loads synchronously so the same input always gives the same run.
+    """
     screen: pg.Surface
 
-    def __init__(self, fps: int, screen_size: tuple[int, int]):
+    def __init__(self, fps: int, screen_size: tuple[int, int], headless: bool = False):
         self.max_fps = fps
         self.clock = pg.time.Clock()
         self.running = False
         self._frame: Callable[[pg.Surface, float], ...] | None = None
         self.size = screen_size
+        self.headless = headless
+        self.profiler = FrameProfiler(fps)
+        self.loader = BackgroundLoader(synchronous=headless)
+        self.recorder: InputRecorder | None = None
+        self._replay_events: list[pg.event.Event] | None = None
+        self._posted_events: list[pg.event.Event] = []
+        self._frame_events: list[pg.event.Event] = []
+        # state checksum recorded with every frame, so replays can detect divergence
+        self.checksum: Callable[[], int | None] = lambda: None
+        # set by SceneManager.init
+        self.scene_manager: SceneManager | None = None
 
     def init(self):
-        self.screen = pg.display.set_mode(self.size)
+        if self.headless:
+            self.screen = pg.Surface(self.size)
+        else:
+            # only what the engine uses, pg.init() would also start audio, joysticks and the rest
+            pg.display.init()
+            self.screen = pg.display.set_mode(self.size)
         self.running = True
 
     def stop(self):
@@ -30,17 +57,100 @@ class GameState:
         self._frame = func
         return func
 
+    def poll_events(self) -> list[pg.event.Event]:
+        """
+        Events of this frame, from pygame or from the replay being played.
+        """
+        if self._replay_events is not None:
+            events = self._replay_events
+            if not self.headless:
+                pg.event.pump()
+        elif self.headless:
+            events, self._posted_events = self._posted_events, []
+        else:
+            events = pg.event.get()
+        self._frame_events = events
+        return events
+
+    def post(self, event: pg.event.Event):
+        """
+        Queue event for the next frame, the only input a headless game gets.
+        """
+        if self.headless:
+            self._posted_events.append(event)
+        else:
+            pg.event.post(event)
+
+    def record(self, path: str | Path):
+        """
+        Record events, delta times and checksums of every frame run from now on.
+        """
+        self.recorder = InputRecorder(path, self.max_fps)
+
+    def stop_recording(self):
+        if self.recorder is not None:
+            self.recorder.close()
+            self.recorder = None
+
+    def replay(self, path: str | Path) -> ReplayResult:
+        """
+        Run frames of a recording as fast as possible, comparing checksums with the recorded ones.
+        """
+        result = ReplayResult(Path(path))
+        self.running = True
+        start = time.perf_counter()
+        for delta_time, events, expected in InputReplay(path):
+            if not self.running or self._frame is None:
+                break
+            self._replay_events = events
+            self.profiler.begin_frame(delta_time)
+            self._frame(self.screen, delta_time)
+            self.profiler.end_frame()
+            if expected is not None:
+                actual = self.checksum()
+                if actual != expected:
+                    result.divergences.append((result.frames, expected, actual))
+            result.frames += 1
+        result.elapsed = time.perf_counter() - start
+        self._replay_events = None
+        self.running = False
+        return result
+
+    def flip(self, rects: list[pg.Rect] | None = None):
+        """
+        Show drawn frame, only given rects when they are passed.
+        """
+        if self.headless:
+            return
+        self.profiler.start("flip")
+        if rects is None:
+            pg.display.update()
+        elif rects:
+            pg.display.update(rects)
+        self.profiler.stop("flip")
+
+    def step(self, delta_time: float):
+        """
+        Run one frame of delta_time seconds, without waiting for the clock.
+        """
+        self.profiler.begin_frame(delta_time)
+        self._frame(self.screen, delta_time)  # maybe you are missing "window" and "delta_time" arguments
+        self.profiler.end_frame()
+        if self.recorder is not None:
+            self.recorder.record_frame(delta_time, self._frame_events, self.checksum())
+
     def run(self):
         while self.running:
             if self._frame is not None:
-                if max_fps != -1:
-                    ms = self.clock.tick(max_fps)
+                if self.max_fps != -1:
+                    ms = self.clock.tick(self.max_fps)
                 else:
                     ms = self.clock.tick()
-                self._frame(self.screen, ms / 1000.0)  # maybe you are missing "window" and "delta_time" arguments
+                self.step(ms / 1000.0)
             else:
                 warn("Running without specified frame executor")
                 break
+        self.stop_recording()
 
 
 size = (800, 800)
@@ -48,9 +158,12 @@ max_fps = 60
 game = None
 
 
-def get_game(game_size: tuple[int, int] | None = None, fps: int | None = None):
+def get_game(game_size: tuple[int, int] | None = None, fps: int | None = None, headless: bool = False):
+    """
+    Create a game with default size and fps, the last one created is kept as the module's game.
+    """
     global game
-    ret = GameState(fps or max_fps, game_size or size)
+    ret = GameState(fps or max_fps, game_size or size, headless)
     game = ret
     return ret
 
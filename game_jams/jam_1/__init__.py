@@ -1,31 +1,106 @@
-from ..engine.window import get_game
-from ..engine import scene_manager
+from __future__ import annotations
+
+from functools import partial
+
+from ..engine import scene_manager, window as engine_window
+from ..engine.base_scene import SceneManager
+from ..engine.window import GameState
+from .color_permutations import PaletteCycle
 from .scenes import MainMenu
+from . import assets
 
 import pygame as pg
 
-game = get_game()
-scene_manager.init(game)
-scene_manager.spawn_scene(MainMenu)
+game: GameState | None = None
+
+
+def new_game(headless: bool = False, size: tuple[int, int] | None = None, fps: int | None = None,
+             manager: SceneManager | None = None, low_power: bool = False,
+             palette_seed: int | None = None) -> GameState:
+    """
+    A game of this jam at its main menu, with its own scene manager unless one is passed.
+    Headless games draw offscreen, so many can run side by side in one process.
+    Each game has its own background palette cycle, random unless palette_seed is given
+    (0 for headless games, so they render the same every run), and low_power keeps its backgrounds still.
+    """
+    ret = GameState(fps or engine_window.max_fps, size or engine_window.size, headless)
+    if palette_seed is None and headless:
+        palette_seed = 0
+    ret.palette = PaletteCycle(seed=palette_seed)
+    ret.animated_background = not low_power
+    manager = manager or SceneManager()
+    manager.init(ret)
+    manager.spawn_scene(MainMenu)
+    ret.checksum = manager.checksum
+    ret.frame(partial(frame, ret))
+    return ret
+
 
+def setup(low_power: bool = False) -> GameState:
+    """
+    Create the game played in the window, done once when the jam is started rather than on import.
+    """
+    global game
+    if game is None:
+        game = new_game(manager=scene_manager, low_power=low_power)
+    return game
 
-@game.frame
-def frame(window: pg.Surface, delta_time: float):
-    for ev in pg.event.get():
+
+def frame(game: GameState, window: pg.Surface, delta_time: float):
+    scene_manager = game.scene_manager
+    game.profiler.start("events")
+    for ev in game.poll_events():
         if ev.type == pg.QUIT:
             game.stop()
+        elif ev.type == pg.KEYDOWN and ev.key == pg.K_F3:
+            game.profiler.toggle_overlay()
+            scene_manager.current.needs_full_redraw = True
         else:
             scene_manager.handle_events(ev)
+    game.profiler.stop("events")
 
     scene_manager.update(delta_time)
 
-    window.fill((0, 0, 0))
+    if scene_manager.full_redraw:
+        window.fill((0, 0, 0))
+
+    dirty = scene_manager.draw(window)
 
-    scene_manager.draw(window)
+    overlay = game.profiler.draw_overlay(window)
+    if overlay and dirty is not None:
+        dirty.append(overlay)
 
-    pg.display.update()
+    game.flip(dirty)
 
 
-def main():
+def main(low_power: bool = False, profile: str | None = None, record: str | None = None):
+    """
+    Run the jam, low_power keeps menu backgrounds still so menus only update changed parts of the screen.
+    With profile, frame timings are collected from the start and written to that file on exit.
+    With record, the session is recorded to that file for replay.
+    F3 toggles the profiler overlay.
+    """
+    game = setup(low_power)
+    if profile:
+        game.profiler.enable()
+    assets.manager.preload()
     game.init()
+    assets.manager.convert_all()
+    if record:
+        # levels have to load at the same frame when the recording is replayed
+        game.loader.synchronous = True
+        game.record(record)
     game.run()
+    if profile:
+        game.profiler.dump(profile)
+
+
+def replay(path: str):
+    """
+    Play recording as fast as possible, returns ReplayResult with checksum divergences.
+    """
+    game = setup()
+    game.loader.synchronous = True
+    game.init()
+    assets.manager.convert_all()
+    return game.replay(path)
@@ -0,0 +1,23 @@
+import argparse
+import os
+import sys
+
+parser = argparse.ArgumentParser(prog="python -m game_jams.jam_1", description="Top and Bottom")
+parser.add_argument("--low-power", action="store_true", help="still menu backgrounds, redraw only changes")
+parser.add_argument("--profile", metavar="FILE", help="collect frame timings and write them to FILE on exit")
+parser.add_argument("--record", metavar="FILE", help="record the session to FILE")
+parser.add_argument("--replay", metavar="FILE", help="replay FILE headlessly as fast as possible")
+args = parser.parse_args()
+
+if args.replay:
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+from . import main, replay  # noqa: E402
+
+if args.replay:
+    result = replay(args.replay)
+    print(result)
+    sys.exit(0 if result.ok else 1)
+else:
+    main(args.low_power, args.profile, args.record)
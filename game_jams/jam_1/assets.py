@@ -1,5 +1,28 @@
+from pathlib import Path
+
 import pygame as pg
 
+from ..engine import AssetManager, BackgroundLoader
+
+manager = AssetManager(Path(__file__).parent / "assets", BackgroundLoader())
+
+
+def _bake_tiles() -> pg.Surface:
+    from .levels.render_level import bake_tile_atlas
+
+    return bake_tile_atlas()
+
+
+manager.register("tiles", _bake_tiles)
+
+fonts = {
+    "font_title": (None, 50),
+    "font_text": (None, 30),
+}
+
 
-font_title = pg.font.Font(None, 50)
-font_text = pg.font.Font(None, 30)
+def __getattr__(name: str) -> pg.font.Font:
+    # fonts are created on first use, importing the jam does not need pygame.font
+    if name in fonts:
+        return manager.font(*fonts[name])
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
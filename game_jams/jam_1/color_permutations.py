@@ -1,7 +1,8 @@
 from __future__ import annotations
 
+from array import array
 from typing import Callable
-from random import randint, shuffle
+from random import Random, randint, shuffle
 
 
 def simple_color_iter(r: int, g: int, b: int, c: bool) -> tuple[int, int, int, bool]:
@@ -61,3 +62,89 @@ def color_iter(r: int = -1, g: int = -1, b: int = -1) -> Callable[[], tuple[int,
         return ret[0], ret[1], ret[2]
 
     return internal_color_iter
+
+
+class Palette:
+    """
+    Precomputed run of simple_color_iter, stored as packed rgb bytes.
+    Start colour and channel order left at -1 and None are drawn from rng, the random module by default.
+    """
+
+    def __init__(self, length: int, r: int = -1, g: int = -1, b: int = -1, seq: list[int] | None = None,
+                 rng: Random | None = None):
+        c = True
+        random_int, random_shuffle = (randint, shuffle) if rng is None else (rng.randint, rng.shuffle)
+        r = random_int(0, 255) if r == -1 else r
+        g = random_int(0, 255) if g == -1 else g
+        b = random_int(0, 255) if b == -1 else b
+        if seq is None:
+            seq = [0, 1, 2]
+            random_shuffle(seq)
+        self.length = length
+        channels = (array("B"), array("B"), array("B"))
+        reds, greens, blues = channels
+        # Runs where only r moves are added as whole ranges, simple_color_iter only handles the turns.
+        while len(reds) < length:
+            need = length - len(reds)
+            if c and r < 255:
+                run = min(255 - r, need)
+                reds.extend(range(r + 1, r + run + 1))
+                r += run
+            elif not c and r > 0:
+                run = min(r, need)
+                reds.extend(range(r - 1, r - run - 1, -1))
+                r -= run
+            else:
+                run = 1
+                r, g, b, c = simple_color_iter(r, g, b, c)
+                reds.append(r)
+            greens.frombytes(bytes((g,)) * run)
+            blues.frombytes(bytes((b,)) * run)
+        self.colors = array("B", bytes(length * 3))
+        for channel, position in zip(channels, seq):
+            self.colors[position::3] = channel
+
+    def color(self, index: int) -> tuple[int, int, int]:
+        index = index % self.length * 3
+        colors = self.colors
+        return colors[index], colors[index + 1], colors[index + 2]
+
+
+class PaletteCycle:
+    """
+    Colour that follows a Palette at rate steps per second and switches to the next palette every period seconds.
+    Colour depends only on elapsed time, not on frame rate, and one cycle can be shared by the scenes of a game.
+
+    The palettes are built once from seed (random when None) and kept as one list of colours,
+    so switching palette only moves start and color() is a plain index.
+    """
+
+    def __init__(self, period: float = 5.0, rate: int = 60, seed: int | None = None, palettes: int = 12):
+        self.period = period
+        self.rate = rate
+        self.seed = seed
+        self.time = 0.0
+        rng = Random(seed)
+        self.colors: list[tuple[int, int, int]] = []
+        for _ in range(palettes):
+            packed = Palette(self.steps, rng=rng).colors
+            self.colors += zip(packed[0::3], packed[1::3], packed[2::3])
+        self.start = 0
+        self.index = 0
+
+    @property
+    def steps(self) -> int:
+        # one spare colour, time * rate can round up to period * rate
+        return int(self.period * self.rate) + 1
+
+    def advance(self, delta_time: float):
+        time = self.time + delta_time
+        if time >= self.period:
+            self.start = (self.start + int(time // self.period) * self.steps) % len(self.colors)
+            time %= self.period
+        self.time = time
+        self.index = self.start + int(time * self.rate)
+
+    def color(self) -> tuple[int, int, int]:
+        return self.colors[self.index]
+
@@ -1,4 +1,4 @@
 from . import raw_level
 from .convert_level import *
 
-listed_levels = raw_level.list_levels()
+listed_levels = raw_level.LevelCatalogue()
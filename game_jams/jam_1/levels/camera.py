@@ -0,0 +1,80 @@
+"""
+Viewport over a level's world coordinates (pixels, 32 per tile) that follows its players.
+"""
+from __future__ import annotations
+
+import math
+from typing import Iterable
+
+import pymunk
+
+
+class Camera:
+    """
+    Top left corner of the view in world coordinates, kept inside the world.
+    A world smaller than the view stays in the top left corner of the screen.
+    """
+
+    def __init__(self, size: tuple[int, int], world_size: tuple[int, int], follow_rate: float = 8.0):
+        self.size = size
+        self.world_size = world_size
+        # fraction of the distance to the target covered per second is 1 - exp(-follow_rate)
+        self.follow_rate = follow_rate
+        self.x = 0.0
+        self.y = 0.0
+
+    @property
+    def offset(self) -> tuple[int, int]:
+        """
+        Screen position of world origin.
+        """
+        return -round(self.x), -round(self.y)
+
+    @property
+    def viewport(self) -> pymunk.BB:
+        x, y = round(self.x), round(self.y)
+        return pymunk.BB(x, y, x + self.size[0], y + self.size[1])
+
+    def world_to_screen(self, point: tuple[float, float]) -> tuple[int, int]:
+        return round(point[0] - round(self.x)), round(point[1] - round(self.y))
+
+    def screen_to_world(self, point: tuple[float, float]) -> tuple[float, float]:
+        return point[0] + round(self.x), point[1] + round(self.y)
+
+    def clamp(self):
+        self.x = min(max(self.x, 0.0), max(self.world_size[0] - self.size[0], 0))
+        self.y = min(max(self.y, 0.0), max(self.world_size[1] - self.size[1], 0))
+
+    def center_on(self, point: tuple[float, float]):
+        """
+        Jump so point is in the middle of the view.
+        """
+        self.x = point[0] - self.size[0] / 2
+        self.y = point[1] - self.size[1] / 2
+        self.clamp()
+
+    def follow(self, point: tuple[float, float], delta_time: float):
+        """
+        Move towards centering on point, smoothly and independent of frame rate.
+        """
+        blend = 1 - math.exp(-self.follow_rate * delta_time)
+        self.x += (point[0] - self.size[0] / 2 - self.x) * blend
+        self.y += (point[1] - self.size[1] / 2 - self.y) * blend
+        self.clamp()
+
+
+def shapes_center(shapes: Iterable[pymunk.Shape]) -> tuple[float, float] | None:
+    """
+    Mean of the bounding box centers of shapes, what a camera following several players looks at.
+    """
+    xs, ys = [], []
+    for shape in shapes:
+        bb = shape.bb
+        xs.append((bb.left + bb.right) / 2)
+        ys.append((bb.bottom + bb.top) / 2)
+    if not xs:
+        return None
+    return sum(xs) / len(xs), sum(ys) / len(ys)
+
+
+__all__ = ["Camera", "shapes_center"]
@@ -0,0 +1,194 @@
+"""
+Chunked binary level format, for worlds too large to hold in memory.
+
+Layout (little endian): header, utf-8 title and theme, player positions, goal count,
+then a table with offset and length of every chunk of the upper board followed by the lower board,
+chunks row by row, then the chunks themselves. A chunk is chunk_size x chunk_size tiles
+(smaller at the right and bottom edges), one byte per tile, zlib compressed; chunks of only air
+are not stored and have length 0. Player positions are stored separately so a level can be started
+without reading its chunks.
+"""
+from __future__ import annotations
+
+import mmap
+import struct
+import threading
+import zlib
+from collections import OrderedDict
+from pathlib import Path
+
+from .raw_level import LevelInfo, RawLevel, Tile, TileBoard
+
+magic = b"TBCK"
+version = 1
+# magic, version, width, height, chunk size, title, theme, players, goals
+header_format = struct.Struct("<4sHIIHHHII")
+player_format = struct.Struct("<II")  # row, col, rows of the lower board follow the upper board
+chunk_format = struct.Struct("<QI")  # offset, length
+chunked_suffix = ".lvlc"
+
+
+class ChunkedLevelError(Exception):
+    pass
+
+
+def write_chunked_level(level: RawLevel, path: Path, chunk_size: int = 64) -> Path:
+    """
+    Write both boards of level chunk by chunk.
+    """
+    upper, lower = level.upper_board, level.lower_board
+    if (upper.width, upper.height) != (lower.width, lower.height):
+        raise ChunkedLevelError("Boards of different sizes can not be chunked together")
+    width, height = upper.width, upper.height
+    chunk_cols, chunk_rows = -(-width // chunk_size), -(-height // chunk_size)
+    title = level.level_info.title.encode()
+    theme = level.level_info.theme.encode()
+    players = upper.positions(Tile.player) + [(row + height, col) for row, col in lower.positions(Tile.player)]
+    goals = upper.count(Tile.goal) + lower.count(Tile.goal)
+    head = header_format.pack(magic, version, width, height, chunk_size, len(title), len(theme), len(players), goals)
+    head += title + theme + b"".join(player_format.pack(row, col) for row, col in players)
+    offset = len(head) + 2 * chunk_rows * chunk_cols * chunk_format.size
+
+    table, payloads = bytearray(), []
+    for board in (upper, lower):
+        for chunk_row in range(chunk_rows):
+            for chunk_col in range(chunk_cols):
+                cells = board.window(chunk_row * chunk_size, chunk_col * chunk_size, chunk_size, chunk_size).buffer
+                payload = zlib.compress(cells) if cells.count(Tile.air.value) != len(cells) else b""
+                table += chunk_format.pack(offset if payload else 0, len(payload))
+                payloads.append(payload)
+                offset += len(payload)
+
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    with tmp.open("wb") as f:
+        f.write(head)
+        f.write(table)
+        for payload in payloads:
+            f.write(payload)
+    tmp.replace(path)
+    return path
+
+
+class ChunkedBoard:
+    """
+    One board of a chunked level, chunks are decompressed when first read.
+    """
+
+    def __init__(self, level: ChunkedLevel, index: int):
+        self.level = level
+        self.index = index
+        self.width = level.width
+        self.height = level.height
+
+    def chunk(self, chunk_col: int, chunk_row: int) -> TileBoard | None:
+        return self.level.chunk(self.index, chunk_col, chunk_row)
+
+    def window(self, top: int, left: int, rows: int, cols: int) -> TileBoard:
+        """
+        Copy of the rows x cols cells starting at (top, left), clipped to the board, decoding only chunks it covers.
+        """
+        size = self.level.chunk_size
+        rows = max(min(rows, self.height - top), 0)
+        cols = max(min(cols, self.width - left), 0)
+        ret = TileBoard(cols, rows)
+        for chunk_row in range(top // size, -(-(top + rows) // size)):
+            for chunk_col in range(left // size, -(-(left + cols) // size)):
+                chunk = self.chunk(chunk_col, chunk_row)
+                if chunk is None:
+                    continue
+                first_row, last_row = max(top, chunk_row * size), min(top + rows, (chunk_row + 1) * size)
+                first_col, last_col = max(left, chunk_col * size), min(left + cols, (chunk_col + 1) * size)
+                chunk_left, chunk_right = first_col - chunk_col * size, last_col - chunk_col * size
+                for row_index in range(first_row, last_row):
+                    line = chunk.row(row_index - chunk_row * size)[chunk_left:chunk_right]
+                    start = (row_index - top) * cols + first_col - left
+                    ret.view[start:start + len(line)] = line
+        return ret
+
+
+class ChunkedLevel:
+    """
+    Memory mapped chunked level, only the header and chunk table are read up front.
+    Decoded chunks are kept in a least recently used cache of max_cached chunks.
+    Has level_info, upper_board and lower_board like RawLevel, boards being ChunkedBoard.
+    """
+
+    def __init__(self, path: Path, max_cached: int = 256):
+        self.path = path
+        self.max_cached = max_cached
+        with path.open("rb") as f:
+            self._mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        data = self._mapped
+        if len(data) < header_format.size:
+            raise ChunkedLevelError(f"{path} is too short for a chunked level")
+        (file_magic, file_version, self.width, self.height, self.chunk_size, title_len, theme_len, players,
+         self.goal_count) = header_format.unpack_from(data)
+        if file_magic != magic:
+            raise ChunkedLevelError(f"{path} is not a chunked level")
+        if file_version != version:
+            raise ChunkedLevelError(f"Unsupported chunked level version {file_version}")
+        offset = header_format.size
+        title = bytes(data[offset:offset + title_len]).decode()
+        theme = bytes(data[offset + title_len:offset + title_len + theme_len]).decode()
+        offset += title_len + theme_len
+        self.level_info = LevelInfo(title, theme, self.width, self.height * 2)
+        self.players = [player_format.unpack_from(data, offset + index * player_format.size)
+                        for index in range(players)]
+        offset += players * player_format.size
+        self.chunk_cols = -(-self.width // self.chunk_size)
+        self.chunk_rows = -(-self.height // self.chunk_size)
+        self._table_offset = offset
+        if len(data) < offset + 2 * self.chunk_rows * self.chunk_cols * chunk_format.size:
+            raise ChunkedLevelError(f"{path} is truncated")
+        self._cache: OrderedDict[tuple[int, int, int], TileBoard | None] = OrderedDict()
+        # chunks may be decoded from background loader threads while the level is stepped
+        self._lock = threading.RLock()
+        self.decoded_chunks = 0
+        self.upper_board = ChunkedBoard(self, 0)
+        self.lower_board = ChunkedBoard(self, 1)
+
+    @property
+    def boards(self) -> tuple[ChunkedBoard, ChunkedBoard]:
+        return self.upper_board, self.lower_board
+
+    def chunk(self, board: int, chunk_col: int, chunk_row: int) -> TileBoard | None:
+        """
+        Tiles of one chunk, None for chunks of only air.
+        """
+        key = (board, chunk_col, chunk_row)
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+        index = (board * self.chunk_rows + chunk_row) * self.chunk_cols + chunk_col
+        offset, length = chunk_format.unpack_from(self._mapped, self._table_offset + index * chunk_format.size)
+        chunk = None
+        if length:
+            size = self.chunk_size
+            cells = bytearray(zlib.decompress(self._mapped[offset:offset + length]))
+            chunk = TileBoard(min(size, self.width - chunk_col * size), min(size, self.height - chunk_row * size),
+                              cells)
+        with self._lock:
+            self.decoded_chunks += 1
+            self._cache[key] = chunk
+            while len(self._cache) > self.max_cached:
+                self._cache.popitem(last=False)
+        return chunk
+
+    @property
+    def cached_bytes(self) -> int:
+        with self._lock:
+            return sum(chunk.nbytes for chunk in self._cache.values() if chunk is not None)
+
+    def close(self):
+        with self._lock:
+            self._cache.clear()
+        self._mapped.close()
+
+
+def load_chunked(path: Path, max_cached: int = 256) -> ChunkedLevel:
+    return ChunkedLevel(path, max_cached)
+
+
+__all__ = ["ChunkedBoard", "ChunkedLevel", "ChunkedLevelError", "chunked_suffix", "load_chunked",
+           "write_chunked_level"]
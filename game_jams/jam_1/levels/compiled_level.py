@@ -0,0 +1,142 @@
+"""
+Compiled binary level format.
+
+Layout (little endian): header, utf-8 title and theme, then the upper and lower tile planes,
+one byte per tile, row by row. The header remembers size and mtime of the csv it was compiled
+from, so a compiled file that is older than its csv is ignored.
+"""
+from __future__ import annotations
+
+import mmap
+import struct
+from pathlib import Path
+
+from .raw_level import RawLevel, LevelInfo, TileBoard, list_raw_levels, load_csv_level
+
+magic = b"TBLV"
+version = 1
+header_format = struct.Struct("<4sHIIQQHH")  # magic, version, width, height, source mtime, source size, title, theme
+compiled_suffix = ".lvl"
+
+
+class CompiledLevelError(Exception):
+    pass
+
+
+def compiled_path(csv_path: Path) -> Path:
+    return csv_path.with_suffix(compiled_suffix)
+
+
+def read_header(data) -> tuple[LevelInfo, int, int, int, int]:
+    """
+    Parses header from start of data.
+    Returns level info, board height, source mtime, source size and offset of the upper tile plane.
+    """
+    if len(data) < header_format.size:
+        raise CompiledLevelError("File too short for a compiled level")
+    file_magic, file_version, width, height, mtime, size, title_len, theme_len = header_format.unpack_from(data)
+    if file_magic != magic:
+        raise CompiledLevelError("Not a compiled level")
+    if file_version != version:
+        raise CompiledLevelError(f"Unsupported compiled level version {file_version}")
+    offset = header_format.size
+    title = bytes(data[offset:offset + title_len]).decode()
+    offset += title_len
+    theme = bytes(data[offset:offset + theme_len]).decode()
+    offset += theme_len
+    return LevelInfo(title, theme, width, height * 2), height, mtime, size, offset
+
+
+def read_header_file(path: Path) -> LevelInfo:
+    """
+    Reads level info from compiled file without touching the tile planes.
+    """
+    with path.open("rb") as f:
+        head = f.read(header_format.size)
+        _, _, _, _, _, _, title_len, theme_len = header_format.unpack(head)
+        head += f.read(title_len + theme_len)
+    return read_header(head)[0]
+
+
+def is_fresh(csv_path: Path, compiled: Path) -> bool:
+    """
+    Whether compiled exists and was built from the current contents of csv_path.
+    """
+    try:
+        with compiled.open("rb") as f:
+            head = f.read(header_format.size)
+        source = csv_path.stat()
+    except OSError:
+        return False
+    if len(head) < header_format.size:
+        return False
+    file_magic, file_version, _, _, mtime, size, _, _ = header_format.unpack(head)
+    return file_magic == magic and file_version == version and (mtime, size) == (source.st_mtime_ns, source.st_size)
+
+
+def load_compiled(path: Path) -> RawLevel:
+    """
+    Memory maps compiled level, both boards are views into the mapping.
+    The mapping is copy on write, so editing a board never touches the file.
+    """
+    with path.open("rb") as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+    level_info, height, _, _, offset = read_header(mapped)
+    plane = level_info.width * height
+    if len(mapped) < offset + 2 * plane:
+        raise CompiledLevelError(f"{path} is truncated")
+    upper = TileBoard(level_info.width, height, mapped, offset)
+    lower = TileBoard(level_info.width, height, mapped, offset + plane)
+    return RawLevel(level_info, upper, lower)
+
+
+def write_compiled(level: RawLevel, out: Path, source_mtime: int = 0, source_size: int = 0) -> Path:
+    """
+    Writes level in compiled format, source_mtime and source_size describe the csv it comes from, if any.
+    """
+    upper, lower = level.upper_board, level.lower_board
+    if (upper.width, upper.height) != (lower.width, lower.height):
+        raise CompiledLevelError(f"Level {level.level_info.title!r} has boards of different sizes")
+    title = level.level_info.title.encode()
+    theme = level.level_info.theme.encode()
+    header = header_format.pack(magic, version, upper.width, upper.height, source_mtime, source_size,
+                                len(title), len(theme))
+    tmp = out.with_suffix(out.suffix + ".tmp")
+    with tmp.open("wb") as f:
+        f.write(header + title + theme)
+        f.write(upper.view)
+        f.write(lower.view)
+    tmp.replace(out)
+    return out
+
+
+def compile_level(csv_path: Path, out: Path | None = None) -> Path:
+    """
+    Compiles level csv into binary format, next to it unless out is given.
+    """
+    source = csv_path.stat()
+    return write_compiled(load_csv_level(csv_path), out or compiled_path(csv_path), source.st_mtime_ns,
+                          source.st_size)
+
+
+def compile_all(force: bool = False) -> list[Path]:
+    """
+    Compiles every listed level whose compiled file is missing or stale.
+    """
+    ret = []
+    for levels in list_raw_levels().values():
+        for csv_path in levels.values():
+            if force or not is_fresh(csv_path, compiled_path(csv_path)):
+                ret.append(compile_level(csv_path))
+    return ret
+
+
+__all__ = ["CompiledLevelError", "compiled_path", "read_header", "read_header_file", "is_fresh", "load_compiled",
+           "write_compiled", "compile_level", "compile_all"]
+
+
+if __name__ == "__main__":
+    import sys
+
+    for compiled_file in compile_all("--force" in sys.argv[1:]):
+        print(f"Compiled {compiled_file}")
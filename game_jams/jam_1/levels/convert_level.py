@@ -3,12 +3,26 @@ Convert RawLevel to pymunk space for physics simulation.
 """
 from __future__ import annotations
 
-from .raw_level import RawLevel, Tile
+import struct
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Callable
+
+from .goals import GoalTracker
+from .raw_level import RawLevel, Tile, TileBoard
+from ...engine.scene_tools import FixedTimestep
 from enum import Enum
 import pymunk
 import pymunk.pygame_util
 import pygame as pg
 
+if TYPE_CHECKING:
+    from .render_level import LevelRenderer
+
+shared = "shared"
+split = "split"
+_step_pool: ThreadPoolExecutor | None = None
+
 
 class CollisionMasks(Enum):
     players = 1
@@ -21,150 +35,369 @@ class CollisionMasks(Enum):
     movable_collide_with = 53  # walls | movable | players | level_boundary
 
 
+# masks of static shapes, everything that moves and collides with them
+walls_collide_with = CollisionMasks.players.value | CollisionMasks.movable.value
+boundary_collides_with = walls_collide_with
+
+
+def merge_tiles(board: TileBoard, tile: Tile) -> list[tuple[int, int, int, int]]:
+    """
+    Greedily cover all cells of given tile kind with maximal rectangles.
+    Returns list of (row, col, rows, cols).
+    """
+    value = tile.value
+    height, width = board.height, board.width
+    # cells still to cover are marked with 1, covered or other tiles with 0
+    pending = [bytearray(1 if cell == value else 0 for cell in board.row(row_index)) for row_index in range(height)]
+    ret = []
+    for row_index in range(height):
+        row = pending[row_index]
+        col_index = row.find(1)
+        while col_index != -1:
+            end = row.find(0, col_index)
+            if end == -1:
+                end = width
+            run = bytes(end - col_index)
+            ones = b"\x01" * (end - col_index)
+            bottom = row_index + 1
+            while bottom < height and pending[bottom][col_index:end] == ones:
+                bottom += 1
+            for covered in pending[row_index:bottom]:
+                covered[col_index:end] = run
+            ret.append((row_index, col_index, bottom - row_index, end - col_index))
+            col_index = row.find(1, end)
+    return ret
+
+
 class PymunkLevel:
+    """
+    Both boards of a level as pymunk bodies, the lower board placed right under the upper one.
+    With layout "shared" both halves live in one space and movables may cross the middle boundary,
+    with "split" each half gets its own space; spaces are stepped together, concurrently with concurrent_step,
+    and a half without awake bodies is not stepped at all.
+
+    Bodies slower than idle_speed for sleep_time seconds fall asleep, a level where every body sleeps
+    is at rest and skips stepping until wake() or an awake body touching a sleeping one.
+    Pass sleep_time=math.inf to keep every body awake.
+    """
     screen: pg.Surface
     draw_options: pymunk.pygame_util.DrawOptions
+    renderer: LevelRenderer
+
+    step_size: float = 1 / 120
+    max_substeps: int = 8
+    merge_walls: bool = True
+    layout: str = shared
+    concurrent_step: bool = False
+    sleep_time: float = 0.5
+    idle_speed: float = 2.0
 
-    def __init__(self, level: RawLevel):
+    def __init__(self, level: RawLevel, step_size: float | None = None, max_substeps: int | None = None,
+                 merge_walls: bool | None = None, progress: Callable[[float], None] | None = None,
+                 layout: str | None = None, concurrent_step: bool | None = None, sleep_time: float | None = None):
         self.raw_level = level
+        if merge_walls is not None:
+            self.merge_walls = merge_walls
+        if layout is not None:
+            self.layout = layout
+        if self.layout not in (shared, split):
+            raise ValueError(f"Unknown layout {self.layout!r}, expected {shared!r} or {split!r}")
+        if concurrent_step is not None:
+            self.concurrent_step = concurrent_step
+        if sleep_time is not None:
+            self.sleep_time = sleep_time
+        # rows of the upper board, lower board rows start there
+        self.lower_offset = level.upper_board.height
         self.space = pymunk.Space()
+        self.spaces = [self.space] if self.layout == shared else [self.space, pymunk.Space()]
+        self.timestep = FixedTimestep(step_size or self.step_size, max_substeps or self.max_substeps)
         self.players: set[pymunk.Shape] = set()
         self.goals: set[pymunk.Shape] = set()
-        self.player_goal_collision_handler = self.space.add_collision_handler(
-            CollisionMasks.players.value, CollisionMasks.goals.value
-        )
+        self.skipped_steps = 0
+        self.goal_tracker = GoalTracker()
 
-        self.activated_goals: int = 0
+        for space in self.spaces:
+            space.sleep_time_threshold = self.sleep_time
+            space.idle_speed_threshold = self.idle_speed
+            self.goal_tracker.attach(space, CollisionMasks.players.value, CollisionMasks.goals.value)
 
-        self.player_goal_collision_handler.pre_solve = self.player_goal_pre_solve
-        self.player_goal_collision_handler.separate = self.player_goal_separate
+        self.populate_space(progress)
+        self.dynamic_bodies = [[body for body in space.bodies if body.body_type == pymunk.Body.DYNAMIC]
+                               for space in self.spaces]
+        # nothing inside a space wakes it once all its bodies sleep, so that is remembered until wake()
+        self._space_resting = [False] * len(self.spaces)
+        self._awake_hint: list[pymunk.Body | None] = [None] * len(self.spaces)
 
-        self.populate_space()
+    @property
+    def lower_space(self) -> pymunk.Space:
+        return self.spaces[-1]
 
     def set_pygame_screen(self, screen: pg.Surface):
         """
         Set pygame screen.
         """
+        from .render_level import LevelRenderer
+
         self.screen = screen
         self.draw_options = pymunk.pygame_util.DrawOptions(self.screen)
+        if not hasattr(self, "renderer"):
+            self.renderer = LevelRenderer(self)
+        if self.renderer.built_for != screen.get_size():
+            self.renderer.set_viewport(screen.get_size())
 
-    def player_goal_pre_solve(self, arbiter: pymunk.Arbiter, space: pymunk.Space, data) -> bool:
-        self.activated_goals += 1
-        return False
+    def prepare_renderer(self, screen_size: tuple[int, int]):
+        """
+        Pre-render static chunks seen on a screen of screen_size, does not need the display so it can run on a loader thread.
+        """
+        from .render_level import LevelRenderer
+
+        if not hasattr(self, "renderer"):
+            self.renderer = LevelRenderer(self)
+        self.renderer.build_static_layer(screen_size)
 
-    def player_goal_separate(self, arbiter, space, data):
-        self.activated_goals -= 1
+    @property
+    def activated_goals(self) -> int:
+        """
+        Number of goals with a player on them.
+        """
+        return len(self.goal_tracker.occupied)
 
-    def add_wall(self, row_index, col_index):
+    def add_wall(self, row_index, col_index, space: pymunk.Space | None = None):
         """
         Add wall to space.
         """
-        wall_shape = pymunk.Poly(self.space.static_body,
-                                 [(col_index * 32, row_index * 32), (col_index * 32 + 32, row_index * 32),
-                                  (col_index * 32 + 32, row_index * 32 + 32),
-                                  (col_index * 32, row_index * 32 + 32)])
+        return self.add_wall_rect(row_index, col_index, 1, 1, space)
+
+    def add_wall_rect(self, row_index, col_index, rows, cols, space: pymunk.Space | None = None):
+        """
+        Add single wall shape covering rows x cols tiles to space.
+        """
+        space = space or self.space
+        left, top = col_index * 32, row_index * 32
+        right, bottom = left + cols * 32, top + rows * 32
+        wall_shape = pymunk.Poly(space.static_body, [(left, top), (right, top), (right, bottom), (left, bottom)])
         wall_shape.friction = 0.5
         wall_shape.collision_type = CollisionMasks.walls.value
-        wall_shape.filter = pymunk.ShapeFilter(CollisionMasks.player_collide_with.value,
-                                               CollisionMasks.movable_collide_with.value)
-        self.space.add(wall_shape)
+        wall_shape.filter = pymunk.ShapeFilter(categories=CollisionMasks.walls.value, mask=walls_collide_with)
+        space.add(wall_shape)
+        return wall_shape
 
-    def add_goal(self, row_index, col_index):
+    def add_goal(self, row_index, col_index, space: pymunk.Space | None = None):
         """
         Add goal to space.
         """
-        goal_shape = pymunk.Circle(self.space.static_body, 16, (col_index * 32 + 16, row_index * 32 + 16))
+        space = space or self.space
+        goal_shape = pymunk.Circle(space.static_body, 16, (col_index * 32 + 16, row_index * 32 + 16))
         goal_shape.friction = 0.5
         goal_shape.collision_type = CollisionMasks.goals.value
-        goal_shape.filter = pymunk.ShapeFilter(CollisionMasks.player_collide_with.value,
-                                               CollisionMasks.movable_collide_with.value)
-        self.space.add(goal_shape)
+        # players only report entering and leaving a goal, they are not pushed away from it
+        goal_shape.sensor = True
+        goal_shape.filter = pymunk.ShapeFilter(categories=CollisionMasks.goals.value,
+                                               mask=CollisionMasks.players.value)
+        space.add(goal_shape)
         self.goals.add(goal_shape)
+        self.goal_tracker.add_goal(goal_shape)
+        return goal_shape
 
-    def add_movable(self, row_index, col_index):
+    def add_movable(self, row_index, col_index, space: pymunk.Space | None = None):
         """
         Add movable to space.
         """
         movable_body = pymunk.Body()
-        movable_body.position = (col_index * 32 + 2, row_index * 32 + 2)
+        movable_body.position = (col_index * 32 + 16, row_index * 32 + 16)
         movable_shape = pymunk.Poly.create_box(movable_body, (28, 28))
+        movable_shape.mass = 10
 
         movable_shape.friction = 0.5
         movable_shape.collision_type = CollisionMasks.movable.value
-        movable_shape.filter = pymunk.ShapeFilter(CollisionMasks.player_collide_with.value,
-                                                  CollisionMasks.movable_collide_with.value)
-        self.space.add(movable_body, movable_shape)
+        movable_shape.filter = pymunk.ShapeFilter(categories=CollisionMasks.movable.value,
+                                                  mask=CollisionMasks.movable_collide_with.value)
+        (space or self.space).add(movable_body, movable_shape)
+        return movable_body
 
-    def add_player(self, row_index, col_index):
+    def add_player(self, row_index, col_index, space: pymunk.Space | None = None):
         """
         Add player to space.
         """
-        player_body = pymunk.Body(100, 100)
-        player_shape = pymunk.Circle(player_body, 16, (col_index * 32 + 16, row_index * 32 + 16))
+        player_body = pymunk.Body(100, pymunk.moment_for_circle(100, 0, 16))
+        player_body.position = (col_index * 32 + 16, row_index * 32 + 16)
+        player_shape = pymunk.Circle(player_body, 16)
         player_shape.friction = 0.5
         player_shape.collision_type = CollisionMasks.players.value
-        player_shape.filter = pymunk.ShapeFilter(CollisionMasks.player_collide_with.value,
-                                                 CollisionMasks.movable_collide_with.value)
-        self.space.add(player_body, player_shape)
+        player_shape.filter = pymunk.ShapeFilter(categories=CollisionMasks.players.value,
+                                                 mask=CollisionMasks.player_collide_with.value)
+        (space or self.space).add(player_body, player_shape)
         self.players.add(player_shape)
+        return player_body
 
-    def add_level_boundaries(self):
+    def add_level_boundaries(self, space: pymunk.Space | None = None, top_row: int = 0, rows: int | None = None):
         """
-        Add level boundaries to space.
+        Add level boundaries to space, around rows top_row..top_row + rows, the whole level by default.
+        They are four segments, a solid shape around the level would overlap everything inside it.
         """
-        level_boundary_shape = pymunk.Poly(self.space.static_body,
-                                           [(0, 0), (self.raw_level.level_info.width * 32, 0),
-                                            (self.raw_level.level_info.width * 32,
-                                             self.raw_level.level_info.height * 32),
-                                            (0, self.raw_level.level_info.height * 32)])
-        level_boundary_shape.friction = 0.5
-        level_boundary_shape.collision_type = CollisionMasks.level_boundary.value
-        level_boundary_shape.filter = pymunk.ShapeFilter(CollisionMasks.player_collide_with.value,
-                                                         CollisionMasks.movable_collide_with.value)
-        self.space.add(level_boundary_shape)
+        width = self.raw_level.level_info.width * 32
+        top = top_row * 32
+        bottom = top + (self.raw_level.level_info.height if rows is None else rows) * 32
+        space = space or self.space
+        corners = [(0, top), (width, top), (width, bottom), (0, bottom)]
+        shapes = []
+        for start, end in zip(corners, corners[1:] + corners[:1]):
+            level_boundary_shape = pymunk.Segment(space.static_body, start, end, 0)
+            level_boundary_shape.friction = 0.5
+            level_boundary_shape.collision_type = CollisionMasks.level_boundary.value
+            level_boundary_shape.filter = pymunk.ShapeFilter(categories=CollisionMasks.level_boundary.value,
+                                                             mask=boundary_collides_with)
+            shapes.append(level_boundary_shape)
+        space.add(*shapes)
+        return shapes
 
-    def add_movable_go_through_boundary(self):
+    def add_movable_go_through_boundary(self, space: pymunk.Space | None = None):
         """
-        Add movable go through boundaries to space.
+        Add movable go through boundary between the halves to space.
         """
-        semi_boundary_shape = pymunk.Poly(self.space.static_body, [(0, self.raw_level.level_info.height / 2),
-                                                                   (self.raw_level.level_info.width,
-                                                                    self.raw_level.level_info.height / 2)])
+        middle = self.lower_offset * 32
+        space = space or self.space
+        semi_boundary_shape = pymunk.Segment(space.static_body, (0, middle),
+                                             (self.raw_level.level_info.width * 32, middle), 0)
         semi_boundary_shape.friction = 0.5
         semi_boundary_shape.collision_type = CollisionMasks.movable_go_through_boundary.value
+        # only players are held in their half, movables pass, as player_collide_with and movable_collide_with say
         semi_boundary_shape.filter = pymunk.ShapeFilter(categories=CollisionMasks.movable_go_through_boundary.value,
-                                                        mask=CollisionMasks.movable.value)
-        self.space.add(semi_boundary_shape)
+                                                        mask=CollisionMasks.players.value)
+        space.add(semi_boundary_shape)
+        return semi_boundary_shape
+
+    def populate_board(self, board: TileBoard, space: pymunk.Space, row_offset: int):
+        """
+        Add shapes of one board to space, rows shifted down by row_offset.
+        """
+        if self.merge_walls:
+            for row_index, col_index, rows, cols in merge_tiles(board, Tile.wall):
+                self.add_wall_rect(row_index + row_offset, col_index, rows, cols, space)
+        else:
+            for row_index, col_index in board.positions(Tile.wall):
+                self.add_wall(row_index + row_offset, col_index, space)
+        for row_index, col_index in board.positions(Tile.player):
+            self.add_player(row_index + row_offset, col_index, space)
+        for row_index, col_index in board.positions(Tile.goal):
+            self.add_goal(row_index + row_offset, col_index, space)
+        for row_index, col_index in board.positions(Tile.movable):
+            self.add_movable(row_index + row_offset, col_index, space)
 
-    def populate_space(self):
+    def populate_space(self, progress: Callable[[float], None] | None = None):
         """
-        Fill space with bodies and shapes from raw level.
+        Fill spaces with bodies and shapes from both boards of raw level, progress is called with fractions done.
         """
-        for row_index, row in enumerate(self.raw_level.upper_board):
-            for col_index, tile in enumerate(row):
-                if tile == Tile.wall:
-                    self.add_wall(row_index, col_index)
-                elif tile == Tile.player:
-                    self.add_player(row_index, col_index)
-                elif tile == Tile.goal:
-                    self.add_goal(row_index, col_index)
-                elif tile == Tile.movable:
-                    self.add_movable(row_index, col_index)
+        progress = progress or (lambda fraction: None)
+        self.populate_board(self.raw_level.upper_board, self.space, 0)
+        progress(0.5)
+        self.populate_board(self.raw_level.lower_board, self.lower_space, self.lower_offset)
+        progress(0.9)
+        if self.layout == shared:
+            self.add_level_boundaries()
+            self.add_movable_go_through_boundary()
+        else:
+            self.add_level_boundaries(self.space, 0, self.lower_offset)
+            self.add_level_boundaries(self.lower_space, self.lower_offset, self.raw_level.lower_board.height)
+        progress(1.0)
 
-        self.add_level_boundaries()
-        self.add_movable_go_through_boundary()
+    def awake_bodies(self, space: pymunk.Space | None = None) -> int:
+        """
+        Dynamic bodies that are not sleeping, in space or in all spaces.
+        """
+        bodies = self.dynamic_bodies if space is None else [self.dynamic_bodies[self.spaces.index(space)]]
+        return sum(not body.is_sleeping for space_bodies in bodies for body in space_bodies)
+
+    def step(self):
+        """
+        Advance spaces by exactly one fixed step.
+        """
+        step = self.timestep.step
+        spaces = [space for index, space in enumerate(self.spaces) if self._space_awake(index)]
+        self.skipped_steps += len(self.spaces) - len(spaces)
+        if self.concurrent_step and len(spaces) > 1:
+            # chipmunk runs without the GIL, so halves step in parallel
+            global _step_pool
+            if _step_pool is None:
+                _step_pool = ThreadPoolExecutor(2, thread_name_prefix="physics")
+            for future in [_step_pool.submit(space.step, step) for space in spaces]:
+                future.result()
+        else:
+            for space in spaces:
+                space.step(step)
+        # goal contacts are applied here, on this thread, once every space finished
+        self.goal_tracker.apply_contacts()
+
+    def _space_awake(self, index: int) -> bool:
+        if self._space_resting[index]:
+            return False
+        hint = self._awake_hint[index]
+        if hint is not None and not hint.is_sleeping:
+            return True
+        for body in self.dynamic_bodies[index]:
+            if not body.is_sleeping:
+                self._awake_hint[index] = body
+                return True
+        self._space_resting[index] = True
+        return False
+
+    @property
+    def resting(self) -> bool:
+        """
+        True when every dynamic body sleeps, stepping would change nothing.
+        """
+        return not any([self._space_awake(index) for index in range(len(self.spaces))])
+
+    def wake(self):
+        """
+        Wake every body, call it before moving bodies from outside the simulation.
+        """
+        for bodies in self.dynamic_bodies:
+            for body in bodies:
+                body.activate()
+        self._space_resting = [False] * len(self.spaces)
 
     def tick(self, dt: float):
         """
-        Update space.
+        Update space, dt of frame time is consumed in fixed steps so physics does not depend on frame rate.
+        """
+        steps = self.timestep.advance(dt)
+        if steps and self.resting:
+            self.skipped_steps += steps * len(self.spaces)
+            return
+        for _ in range(steps):
+            self.step()
+
+    def checksum(self) -> int:
+        """
+        crc32 of position, angle and velocity of every body, to catch simulations that diverge.
         """
-        self.space.step(dt)
+        data = bytearray()
+        for body in (body for space in self.spaces for body in space.bodies):
+            data += struct.pack("<5d", body.position.x, body.position.y, body.angle, body.velocity.x, body.velocity.y)
+        return zlib.crc32(data)
+
+    def follow_players(self, delta_time: float):
+        """
+        Move the camera towards the players.
+        """
+        if hasattr(self, "renderer"):
+            self.renderer.follow_players(delta_time)
 
     def draw(self):
         """
-        Draw space.
+        Draw what the camera sees.
+        """
+        self.renderer.draw(self.screen)
+
+    def debug_draw(self):
+        """
+        Draw space with pymunk's debug drawing, moved by the camera but not culled.
         """
+        camera = self.renderer.camera
+        if camera is not None:
+            self.draw_options.transform = pymunk.Transform.translation(*camera.offset)
         self.space.debug_draw(self.draw_options)
 
 
-__all__ = ['PymunkLevel']
+__all__ = ['PymunkLevel', 'merge_tiles']
@@ -0,0 +1,152 @@
+"""
+Seeded generator of levels of any size, for benchmarks and stress tests.
+
+Walls come in blocky rooms with a wall floor under each board, players, goals and movables are scattered
+over air. The same seed and settings always give the same level.
+
+Run as "python -m game_jams.jam_1.levels.generate out.csv --size 256 [--seed 1]", the suffix of the
+output picks the format: .csv, .lvl (compiled) or .lvlc (chunked).
+"""
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+from random import Random
+from typing import Mapping
+
+from .raw_level import LevelInfo, RawLevel, Tile, TileBoard, dump_csv_level
+
+# fraction of the cells of a board holding each tile, walls are approximate as rooms overlap
+default_density: dict[Tile, float] = {
+    Tile.wall: 0.25,
+    Tile.player: 0.0,
+    Tile.goal: 1 / 4096,
+    Tile.movable: 1 / 512,
+}
+# every board gets at least this many, so a generated level can be played
+minimum_counts: dict[Tile, int] = {Tile.player: 1, Tile.goal: 1}
+# average cells of a room, 1 to 10 columns by 1 to 6 rows
+_room_cells = 5.5 * 3.5
+
+
+def tile_counts(width: int, height: int, density: Mapping[Tile, float] | None = None,
+                counts: Mapping[Tile, int] | None = None) -> dict[Tile, int]:
+    """
+    Players, goals and movables to place on a width x height board, exact counts win over density.
+    """
+    density = {**default_density, **(density or {})}
+    ret = {}
+    for tile in (Tile.player, Tile.goal, Tile.movable):
+        if counts is not None and tile in counts:
+            ret[tile] = counts[tile]
+        else:
+            ret[tile] = max(minimum_counts.get(tile, 0), round(density[tile] * width * height))
+    return ret
+
+
+def _find_cell(cells: bytearray, value: int, end: int, start: int) -> int | None:
+    """
+    First cell holding value at or after start, wrapping around to the front, among cells[:end].
+    """
+    index = cells.find(value, start, end)
+    if index == -1:
+        index = cells.find(value, 0, start)
+    return None if index == -1 else index
+
+
+def generate_board(width: int, height: int, rng: Random, density: Mapping[Tile, float] | None = None,
+                   counts: Mapping[Tile, int] | None = None) -> TileBoard:
+    """
+    One board, tiles are written straight into its buffer so boards of millions of cells take seconds.
+    Items only go on air and never on each other, the players and goals of minimum_counts take a wall
+    when a board is too full for them, other items are left out.
+    """
+    board = TileBoard(width, height)
+    cells = board.buffer
+    wall = bytes([Tile.wall.value])
+    # a board of one row has no room for a floor
+    free_rows = height - 1 if height > 1 else height
+    cells[free_rows * width:] = wall * (height - free_rows) * width
+    wall_density = {**default_density, **(density or {})}[Tile.wall]
+    for _ in range(round(wall_density * width * height / _room_cells)):
+        top, left = rng.randrange(height), rng.randrange(width)
+        cols = min(rng.randint(1, 10), width - left)
+        rows = rng.randint(1, 6)
+        for row in range(top, min(top + rows, free_rows)):
+            cells[row * width + left:row * width + left + cols] = wall * cols
+    # items go on air above the floor, guaranteed players and goals are placed before movables
+    end = free_rows * width
+    for tile, count in tile_counts(width, height, density, counts).items():
+        for number in range(count):
+            for _ in range(8):
+                index = rng.randrange(free_rows) * width + rng.randrange(width)
+                if cells[index] == Tile.air.value:
+                    break
+            else:
+                index = _find_cell(cells, Tile.air.value, end, index)
+                if index is None and number < minimum_counts.get(tile, 0):
+                    index = _find_cell(cells, Tile.wall.value, end, rng.randrange(end))
+                if index is None:
+                    continue
+            cells[index] = tile.value
+    return board
+
+
+def generate_level(width: int, height: int | None = None, seed: int = 0, density: Mapping[Tile, float] | None = None,
+                   counts: Mapping[Tile, int] | None = None, title: str = "Generated",
+                   theme: str = "default") -> RawLevel:
+    """
+    Level with two generated boards of width x height tiles each, square when height is not given.
+    density gives the fraction of cells for each Tile and counts exact numbers of players, goals and movables
+    per board, both fall back to default_density.
+    """
+    height = width if height is None else height
+    rng = Random(seed)
+    upper = generate_board(width, height, rng, density, counts)
+    lower = generate_board(width, height, rng, density, counts)
+    return RawLevel(LevelInfo(title, theme, width, height * 2), upper, lower)
+
+
+def write_level(level: RawLevel, path: Path, chunk_size: int = 64) -> Path:
+    """
+    Write level in the format named by the suffix of path: .csv, .lvl (compiled) or .lvlc (chunked).
+    """
+    if path.suffix == ".csv":
+        dump_csv_level(level, path)
+        return path
+    if path.suffix == ".lvl":
+        from .compiled_level import write_compiled
+
+        return write_compiled(level, path)
+    if path.suffix == ".lvlc":
+        from .chunked_level import write_chunked_level
+
+        return write_chunked_level(level, path, chunk_size)
+    raise ValueError(f"Unknown level format {path.suffix!r}, expected .csv, .lvl or .lvlc")
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description="Generate a level file.")
+    parser.add_argument("out", type=Path, help="output file, .csv, .lvl or .lvlc")
+    parser.add_argument("--size", type=int, default=64, help="columns of each board")
+    parser.add_argument("--height", type=int, default=None, help="rows of each board, defaults to size")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--chunk-size", type=int, default=64)
+    for tile in default_density:
+        parser.add_argument(f"--{tile.name}-density", type=float, default=default_density[tile])
+        if tile is not Tile.wall:
+            parser.add_argument(f"--{tile.name}s", type=int, default=None, help=f"exact {tile.name}s per board")
+    args = parser.parse_args(argv)
+
+    density = {tile: getattr(args, f"{tile.name}_density") for tile in default_density}
+    counts = {tile: getattr(args, f"{tile.name}s") for tile in default_density
+              if tile is not Tile.wall and getattr(args, f"{tile.name}s") is not None}
+    level = generate_level(args.size, args.height, args.seed, density, counts)
+    print(f"Wrote {write_level(level, args.out, args.chunk_size)}")
+
+
+__all__ = ["default_density", "generate_board", "generate_level", "tile_counts", "write_level"]
+
+
+if __name__ == "__main__":
+    main()
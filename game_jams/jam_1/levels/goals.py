@@ -0,0 +1,117 @@
+"""
+Track which goals have a player on them, from begin and separate collision callbacks.
+"""
+from __future__ import annotations
+
+from functools import partial
+from typing import Callable, Iterable
+
+import pymunk
+
+occupied = "occupied"
+vacated = "vacated"
+completed = "completed"
+
+
+class GoalTracker:
+    """
+    Set of goals with at least one player on them, changed only when a player enters or leaves a goal.
+    Every change is queued as a (kind, goal) event, kind being occupied, vacated or completed;
+    completed events carry None as goal and are queued when the last free goal gets occupied.
+    Levels that add and remove goals as they stream in pass their total number of goals as total.
+
+    Collision callbacks only queue contacts, one queue per attached space, and apply_contacts applies them
+    space by space in attach order. Spaces stepped on different threads then never touch shared state,
+    and events come out in the same order however the steps interleaved.
+    """
+
+    def __init__(self, goals: Iterable[pymunk.Shape] = (),
+                 on_event: Callable[[str, pymunk.Shape | None], None] | None = None, total: int | None = None):
+        self.goals: set[pymunk.Shape] = set(goals)
+        self.total = total
+        self.occupied: set[pymunk.Shape] = set()
+        # players touching each occupied goal, a goal stays occupied until the last one leaves
+        self._players: dict[pymunk.Shape, int] = {}
+        self.events: list[tuple[str, pymunk.Shape | None]] = []
+        self.on_event = on_event
+        # (goal, entered) contacts of each attached space, waiting for apply_contacts
+        self._contacts: list[list[tuple[pymunk.Shape, bool]]] = []
+
+    def attach(self, space: pymunk.Space, player_type: int, goal_type: int):
+        contacts = []
+        self._contacts.append(contacts)
+        handler = space.add_collision_handler(player_type, goal_type)
+        handler.begin = partial(self._queue, contacts, True)
+        handler.separate = partial(self._queue, contacts, False)
+
+    def apply_contacts(self):
+        """
+        Apply contacts queued by collision callbacks, call it once every space finished its step.
+        """
+        for contacts in self._contacts:
+            for goal, entered in contacts:
+                if entered:
+                    self._enter(goal)
+                else:
+                    self._leave(goal)
+            contacts.clear()
+
+    def add_goal(self, goal: pymunk.Shape):
+        self.goals.add(goal)
+
+    def remove_goal(self, goal: pymunk.Shape):
+        """
+        Forget goal, without queuing events.
+        """
+        self.goals.discard(goal)
+        self.occupied.discard(goal)
+        self._players.pop(goal, None)
+
+    @property
+    def complete(self) -> bool:
+        total = len(self.goals) if self.total is None else self.total
+        return bool(total) and len(self.occupied) == total
+
+    def poll(self) -> list[tuple[str, pymunk.Shape | None]]:
+        """
+        Drain queued events in the order they happened.
+        """
+        events, self.events = self.events, []
+        return events
+
+    def _emit(self, kind: str, goal: pymunk.Shape | None):
+        self.events.append((kind, goal))
+        if self.on_event is not None:
+            self.on_event(kind, goal)
+
+    @staticmethod
+    def _queue(contacts: list[tuple[pymunk.Shape, bool]], entered: bool, arbiter: pymunk.Arbiter,
+               space: pymunk.Space, data) -> bool:
+        contacts.append((arbiter.shapes[1], entered))
+        # goals are sensors, there is nothing to solve
+        return True
+
+    def _enter(self, goal: pymunk.Shape):
+        count = self._players.get(goal, 0) + 1
+        self._players[goal] = count
+        if count == 1:
+            self.occupied.add(goal)
+            self._emit(occupied, goal)
+            if self.complete:
+                self._emit(completed, None)
+
+    def _leave(self, goal: pymunk.Shape):
+        if goal not in self.goals:
+            # removed goals report separating from players still on them
+            return
+        count = self._players.get(goal, 0) - 1
+        if count > 0:
+            self._players[goal] = count
+            return
+        self._players.pop(goal, None)
+        if goal in self.occupied:
+            self.occupied.discard(goal)
+            self._emit(vacated, goal)
+
+
+__all__ = ["GoalTracker", "completed", "occupied", "vacated"]
@@ -0,0 +1,121 @@
+"""
+Run PymunkLevel simulation without a window, on a fixed timestep.
+"""
+from __future__ import annotations
+
+import time
+import tracemalloc
+
+from .raw_level import RawLevel, list_levels
+from .convert_level import PymunkLevel
+from ...engine.scene_tools import percentiles
+
+
+class SimulationReport:
+    def __init__(self, name: str, step_times: list[float], allocated: int, peak: int, blocks: int,
+                 awake_bodies: int = 0, bodies: int = 0, skipped_steps: int = 0):
+        self.name = name
+        self.steps = len(step_times)
+        self.total_time = sum(step_times)
+        self.steps_per_second = self.steps / self.total_time if self.total_time else 0.0
+        self.p50, self.p90, self.p99 = percentiles(step_times, 50, 90, 99)
+        self.max = max(step_times, default=0.0)
+        self.allocated = allocated
+        self.peak = peak
+        self.blocks = blocks
+        self.awake_bodies = awake_bodies
+        self.bodies = bodies
+        self.skipped_steps = skipped_steps
+
+    def as_dict(self) -> dict[str, float | int | str]:
+        return {
+            "name": self.name,
+            "steps": self.steps,
+            "steps_per_second": self.steps_per_second,
+            "p50_us": self.p50 * 1e6,
+            "p90_us": self.p90 * 1e6,
+            "p99_us": self.p99 * 1e6,
+            "max_us": self.max * 1e6,
+            "allocated_bytes": self.allocated,
+            "peak_bytes": self.peak,
+            "allocated_blocks": self.blocks,
+            "awake_bodies": self.awake_bodies,
+            "bodies": self.bodies,
+            "skipped_steps": self.skipped_steps,
+        }
+
+
+class HeadlessRunner:
+    """
+    Steps a level on a fixed timestep, never touching pg.display.
+    """
+
+    def __init__(self, raw_level: RawLevel, step_size: float | None = None, **level_options):
+        self.raw_level = raw_level
+        self.level_options = dict(level_options, step_size=step_size)
+        self.level = PymunkLevel(raw_level, **self.level_options)
+
+    def run_frames(self, frame_times: list[float]) -> int:
+        """
+        Feed variable frame times through the level's accumulator, as the interactive loop does.
+        Returns number of physics steps taken.
+        """
+        before = self.level.timestep.steps
+        for dt in frame_times:
+            self.level.tick(dt)
+        return self.level.timestep.steps - before
+
+    def measure(self, steps: int, name: str = "", warmup: int = 10) -> SimulationReport:
+        """
+        Time steps individually, then repeat them under tracemalloc to count allocations.
+        Both passes run on a fresh level so neither one sees the other's state.
+        Each step is a real PymunkLevel.step, spaces whose bodies all sleep are still skipped by it
+        and counted in skipped_steps, pass sleep_time=math.inf to time stepping every space.
+        """
+        level = PymunkLevel(self.raw_level, **self.level_options)
+        for _ in range(warmup):
+            level.step()
+        step_times = []
+        counter = time.perf_counter
+        skipped = level.skipped_steps
+        for _ in range(steps):
+            start = counter()
+            level.step()
+            step_times.append(counter() - start)
+        skipped = level.skipped_steps - skipped
+        awake = level.awake_bodies()
+        bodies = sum(map(len, level.dynamic_bodies))
+
+        level = PymunkLevel(self.raw_level, **self.level_options)
+        for _ in range(warmup):
+            level.step()
+        was_tracing = tracemalloc.is_tracing()
+        if not was_tracing:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        before = tracemalloc.take_snapshot()
+        start_size, _ = tracemalloc.get_traced_memory()
+        for _ in range(steps):
+            level.step()
+        end_size, peak = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot()
+        if not was_tracing:
+            tracemalloc.stop()
+        blocks = sum(stat.count_diff for stat in after.compare_to(before, "filename") if stat.count_diff > 0)
+        return SimulationReport(name, step_times, end_size - start_size, peak - start_size, blocks, awake, bodies,
+                                skipped)
+
+
+def measure_levels(steps: int = 1000, step_size: float | None = None, **level_options) -> list[SimulationReport]:
+    """
+    Measure every level from list_levels(), level_options go to PymunkLevel.
+    """
+    reports = []
+    for world, levels in sorted(list_levels().items()):
+        for num, raw_level in sorted(levels.items()):
+            runner = HeadlessRunner(raw_level, step_size, **level_options)
+            reports.append(runner.measure(steps, f"level_{world}_{num}"))
+    return reports
+
+
+__all__ = ["HeadlessRunner", "SimulationReport", "measure_levels"]
@@ -4,9 +4,17 @@ Loader for raw level data.
 from __future__ import annotations
 
 import re
-from functools import lru_cache, cache
+import threading
+from collections import OrderedDict
+from collections.abc import Mapping
+from functools import lru_cache
 from pathlib import Path
 from enum import Enum
+from itertools import compress, repeat
+from typing import TYPE_CHECKING, Iterable, Iterator
+
+if TYPE_CHECKING:
+    from .spatial_index import SpatialIndex
 
 
 class Tile(Enum):
@@ -17,6 +25,132 @@ class Tile(Enum):
     movable = 4
 
 
+tiles_by_value: tuple[Tile, ...] = tuple(sorted(Tile, key=lambda tile: tile.value))
+# translate() tables turning cells of one tile value into 1 and everything else into 0
+_match_tables = [bytes(int(value == tile.value) for value in range(256)) for tile in tiles_by_value]
+
+
+class TileRow:
+    """
+    Read only view of one board row that yields Tile objects, for code that iterates rows.
+    """
+    __slots__ = ("_view",)
+
+    def __init__(self, view: memoryview):
+        self._view = view
+
+    def __len__(self) -> int:
+        return len(self._view)
+
+    def __getitem__(self, index: int | slice) -> Tile | list[Tile]:
+        if isinstance(index, slice):
+            return [tiles_by_value[value] for value in self._view[index]]
+        return tiles_by_value[self._view[index]]
+
+    def __iter__(self) -> Iterator[Tile]:
+        return map(tiles_by_value.__getitem__, self._view)
+
+    def __eq__(self, other) -> bool:
+        return list(self) == list(other)
+
+
+class TileBoard:
+    """
+    Board of tiles stored as one uint8 per cell, row by row, inside a single buffer.
+    """
+
+    def __init__(self, width: int, height: int, buffer: bytearray | None = None, offset: int = 0):
+        self.width = width
+        self.height = height
+        self.buffer = bytearray(width * height) if buffer is None else buffer
+        self.offset = offset
+        self.view = memoryview(self.buffer)[offset:offset + width * height]
+        if len(self.view) != width * height:
+            raise ValueError(f"Board buffer holds {len(self.view)} cells, expected {width}x{height}")
+
+    @classmethod
+    def from_rows(cls, rows: list[list[str]] | list[list[int]]) -> TileBoard:
+        """
+        Build board from rows of tile values (ints or their string form).
+        """
+        height = len(rows)
+        width = len(rows[0]) if rows else 0
+        data = bytearray()
+        for row in rows:
+            if len(row) != width:
+                raise ValueError(f"Board rows have different lengths ({len(row)} != {width})")
+            data.extend(map(int, row))
+        if data and max(data) >= len(tiles_by_value):
+            raise ValueError(f"{max(data)} is not a valid Tile")
+        return cls(width, height, data)
+
+    @classmethod
+    def from_tiles(cls, rows: Iterable[Iterable[Tile]]) -> TileBoard:
+        return cls.from_rows([[tile.value for tile in row] for row in rows])
+
+    def __len__(self) -> int:
+        return self.height
+
+    def __getitem__(self, index: int | tuple[int, int]) -> TileRow | Tile:
+        if isinstance(index, tuple):
+            return tiles_by_value[self.view[index[0] * self.width + index[1]]]
+        if index < 0:
+            index += self.height
+        if not 0 <= index < self.height:
+            raise IndexError("board row out of range")
+        return TileRow(self.row(index))
+
+    def __iter__(self) -> Iterator[TileRow]:
+        for row_index in range(self.height):
+            yield TileRow(self.row(row_index))
+
+    def row(self, row_index: int) -> memoryview:
+        """
+        Raw uint8 values of a row, without copying.
+        """
+        return self.view[row_index * self.width:(row_index + 1) * self.width]
+
+    def column(self, col_index: int) -> memoryview:
+        """
+        Raw uint8 values of a column, as a strided view without copying.
+        """
+        return self.view[col_index::self.width]
+
+    def window(self, top: int, left: int, rows: int, cols: int) -> TileBoard:
+        """
+        Copy of the rows x cols cells starting at (top, left), clipped to the board.
+        """
+        rows = max(min(rows, self.height - top), 0)
+        cols = max(min(cols, self.width - left), 0)
+        data = bytearray()
+        for row_index in range(top, top + rows):
+            data += self.view[row_index * self.width + left:row_index * self.width + left + cols]
+        return TileBoard(cols, rows, data)
+
+    def get(self, row_index: int, col_index: int) -> Tile:
+        return tiles_by_value[self.view[row_index * self.width + col_index]]
+
+    def set(self, row_index: int, col_index: int, tile: Tile):
+        self.view[row_index * self.width + col_index] = tile.value
+
+    def positions(self, tile: Tile) -> list[tuple[int, int]]:
+        """
+        (row, col) of every cell holding tile, in row major order.
+        """
+        mask = self.view.tobytes().translate(_match_tables[tile.value])
+        return list(map(divmod, compress(range(len(mask)), mask), repeat(self.width)))
+
+    def count(self, tile: Tile) -> int:
+        return self.view.tobytes().count(tile.value)
+
+    def to_lists(self) -> list[list[Tile]]:
+        return [list(row) for row in self]
+
+    @property
+    def nbytes(self) -> int:
+        return self.width * self.height
+
+
 class LevelInfo:
     def __init__(self, title: str, theme: str, width: int, height: int):
         self.title = title
@@ -26,33 +160,54 @@ class LevelInfo:
 
 
 class RawLevel:
-    def __init__(self, level_info: LevelInfo, upper_board: list[list[Tile]], lower_board: list[list[Tile]]):
+    def __init__(self, level_info: LevelInfo, upper_board: TileBoard | list[list[Tile]],
+                 lower_board: TileBoard | list[list[Tile]]):
         self.level_info = level_info
-        self.upper_board = upper_board
-        self.lower_board = lower_board
+        self.upper_board = upper_board if isinstance(upper_board, TileBoard) else TileBoard.from_tiles(upper_board)
+        self.lower_board = lower_board if isinstance(lower_board, TileBoard) else TileBoard.from_tiles(lower_board)
+        self._indexes: dict[str, SpatialIndex] = {}
 
     @classmethod
     def parse_raw(cls, info: list[str], upper: list[list[str]], lower: list[list[str]]) -> RawLevel:
         level_info = LevelInfo(info[0], info[1], int(info[2]), int(info[3]) * 2)
-        upper_board = [[Tile(int(tile)) for tile in row] for row in upper]
-        lower_board = [[Tile(int(tile)) for tile in row] for row in lower]
+        upper_board = TileBoard.from_rows(upper)
+        lower_board = TileBoard.from_rows(lower)
         return cls(level_info, upper_board, lower_board)
 
+    def index(self, board: str = "upper") -> SpatialIndex:
+        """
+        Spatial index of "upper" or "lower" board, built on first use.
+        Tiles changed through it stay in sync with the board.
+        """
+        if board not in self._indexes:
+            from .spatial_index import SpatialIndex
 
-level_file_name_format = r"level_\d_\d\.csv"
+            self._indexes[board] = SpatialIndex(getattr(self, f"{board}_board"))
+        return self._indexes[board]
 
+    @property
+    def upper_index(self) -> SpatialIndex:
+        return self.index("upper")
 
-@lru_cache(maxsize=1)
-def list_raw_levels():
+    @property
+    def lower_index(self) -> SpatialIndex:
+        return self.index("lower")
+
+
+level_file_name_format = r"level_\d+_\d+\.csv"
+default_levels_dir = Path(__file__).parent / "game_levels"
+
+
+@lru_cache(maxsize=4)
+def list_raw_levels(levels_dir: Path = default_levels_dir):
     """
     Returns a list of all game_levels in the "game_levels" directory.
     It does not load them from files, just lists them
     """
-    levels_dir = Path(__file__).parent / "game_levels"
     ret: dict[int, dict[int, Path]] = {}
     for file in levels_dir.iterdir():
         # check if file is a level file using regex
-        if re.match(level_file_name_format, file.name):
+        if re.fullmatch(level_file_name_format, file.name):
             # get both numbers from file name using regex
             level_nums = re.findall(r"\d+", file.name)
             level_world = int(level_nums[0])
@@ -75,12 +230,10 @@ def parse_text(text: str) -> list[list[str]]:
     return ret
 
 
-@cache
-def load_level(level_world: int, level_num: int) -> RawLevel:
+def load_csv_level(file: Path) -> RawLevel:
     """
-    Loads a level from a file.
+    Parses a level from its csv file.
     """
-    file = list_raw_levels()[level_world][level_num]
     with file.open() as f:
         extra_info = parse_text(f.readline())[0]
         text = f.read()
@@ -90,6 +243,53 @@ def load_level(level_world: int, level_num: int) -> RawLevel:
     return RawLevel.parse_raw(extra_info, upper, lower)
 
 
+def dump_csv_level(level: RawLevel, file: Path):
+    """
+    Writes level in the csv format read by load_csv_level.
+    """
+    info = level.level_info
+    with file.open("w") as f:
+        f.write(f"{info.title},{info.theme},{info.width},{info.height // 2}\n")
+        for index, board in enumerate((level.upper_board, level.lower_board)):
+            if index:
+                f.write("\n!\n")
+            f.write("\n".join(",".join(map(str, board.row(row_index))) for row_index in range(board.height)))
+
+
+def load_level_info(file: Path) -> LevelInfo:
+    """
+    Reads only level header, from the compiled file when it is up-to-date, otherwise from the first csv line.
+    """
+    from .compiled_level import compiled_path, is_fresh, read_header_file
+
+    compiled = compiled_path(file)
+    if is_fresh(file, compiled):
+        return read_header_file(compiled)
+    with file.open() as f:
+        info = parse_text(f.readline().rstrip("\n"))[0]
+    return LevelInfo(info[0], info[1], int(info[2]), int(info[3]) * 2)
+
+
+def load_level_file(file: Path) -> RawLevel:
+    """
+    Loads a level from its compiled file when there is an up-to-date one, otherwise from the csv.
+    """
+    from .compiled_level import compiled_path, is_fresh, load_compiled
+
+    compiled = compiled_path(file)
+    if is_fresh(file, compiled):
+        return load_compiled(compiled)
+    return load_csv_level(file)
+
+
+@lru_cache(maxsize=32)
+def load_level(level_world: int, level_num: int) -> RawLevel:
+    """
+    Loads a level from a file.
+    """
+    return load_level_file(list_raw_levels()[level_world][level_num])
+
+
 @lru_cache(maxsize=1)
 def list_levels() -> dict[int, dict[int, RawLevel]]:
     """
@@ -105,4 +305,99 @@ def list_levels() -> dict[int, dict[int, RawLevel]]:
     return ret
 
 
-__all__ = ["RawLevel", "Tile", "LevelInfo", "load_level", "list_levels"]
+class WorldCatalogue(Mapping):
+    """
+    Levels of a single world, loaded on first access.
+    """
+
+    def __init__(self, catalogue: LevelCatalogue, world: int, files: dict[int, Path]):
+        self.catalogue = catalogue
+        self.world = world
+        self.files = files
+
+    def __getitem__(self, level_num: int) -> RawLevel:
+        return self.catalogue.load(self.files[level_num])
+
+    def __contains__(self, level_num) -> bool:
+        return level_num in self.files
+
+    def __iter__(self):
+        return iter(sorted(self.files))
+
+    def __len__(self) -> int:
+        return len(self.files)
+
+    def info(self, level_num: int) -> LevelInfo:
+        """
+        Level header, without parsing its boards.
+        """
+        return self.catalogue.info(self.files[level_num])
+
+
+class LevelCatalogue(Mapping):
+    """
+    Same interface as list_levels() result, but only lists files up front.
+    Boards are parsed on first access and at most max_loaded of them are kept.
+    """
+
+    def __init__(self, levels_dir: Path = default_levels_dir, max_loaded: int = 8):
+        self.levels_dir = levels_dir
+        self.max_loaded = max_loaded
+        self._worlds: dict[int, WorldCatalogue] | None = None
+        self._infos: dict[Path, LevelInfo] = {}
+        self._loaded: OrderedDict[Path, RawLevel] = OrderedDict()
+        # levels may be loaded from background loader threads
+        self._lock = threading.RLock()
+
+    @property
+    def worlds(self) -> dict[int, WorldCatalogue]:
+        if self._worlds is None:
+            self._worlds = {
+                world: WorldCatalogue(self, world, files)
+                for world, files in list_raw_levels(self.levels_dir).items()
+            }
+        return self._worlds
+
+    def __getitem__(self, world: int) -> WorldCatalogue:
+        return self.worlds[world]
+
+    def __contains__(self, world) -> bool:
+        return world in self.worlds
+
+    def __iter__(self):
+        return iter(sorted(self.worlds))
+
+    def __len__(self) -> int:
+        return len(self.worlds)
+
+    def info(self, file: Path) -> LevelInfo:
+        with self._lock:
+            if file not in self._infos:
+                self._infos[file] = load_level_info(file)
+            return self._infos[file]
+
+    def load(self, file: Path) -> RawLevel:
+        with self._lock:
+            if file in self._loaded:
+                self._loaded.move_to_end(file)
+                return self._loaded[file]
+        level = load_level_file(file)
+        with self._lock:
+            self._loaded[file] = level
+            if len(self._loaded) > self.max_loaded:
+                self._loaded.popitem(last=False)
+        return level
+
+    def refresh(self):
+        """
+        Forget everything, so files added or changed since are picked up.
+        """
+        list_raw_levels.cache_clear()
+        with self._lock:
+            self._worlds = None
+            self._infos.clear()
+            self._loaded.clear()
+
+
+__all__ = ["RawLevel", "Tile", "TileBoard", "TileRow", "LevelInfo", "load_level", "load_level_file", "load_level_info",
+           "dump_csv_level", "list_levels", "LevelCatalogue", "WorldCatalogue"]
@@ -0,0 +1,250 @@
+"""
+Draw PymunkLevel with pygame through a camera, static geometry is rendered once into cached chunks.
+"""
+from __future__ import annotations
+
+from collections import OrderedDict
+from itertools import compress
+from typing import TYPE_CHECKING, Iterable
+
+import pymunk
+import pygame as pg
+
+from .camera import Camera, shapes_center
+from .convert_level import CollisionMasks
+from .raw_level import Tile, TileBoard, tiles_by_value
+
+if TYPE_CHECKING:
+    from .convert_level import PymunkLevel
+
+
+shape_colors: dict[int, tuple[int, int, int]] = {
+    CollisionMasks.walls.value: (40, 40, 40),
+    CollisionMasks.goals.value: (255, 215, 0),
+    CollisionMasks.players.value: (50, 120, 255),
+    CollisionMasks.movable.value: (170, 100, 40),
+    CollisionMasks.level_boundary.value: (255, 255, 255),
+    CollisionMasks.movable_go_through_boundary.value: (200, 200, 200),
+}
+# shapes drawn as outlines only, the level boundary encloses everything else
+outlined_types = {CollisionMasks.level_boundary.value, CollisionMasks.movable_go_through_boundary.value}
+default_color = (255, 0, 255)
+
+
+def draw_shape(surface: pg.Surface, shape: pymunk.Shape, offset: tuple[int, int] = (0, 0)):
+    """
+    Draw single shape in world coordinates, moved by offset.
+    """
+    color = shape_colors.get(shape.collision_type, default_color)
+    width = 1 if shape.collision_type in outlined_types else 0
+    body = shape.body
+    if isinstance(shape, pymunk.Circle):
+        center = body.local_to_world(shape.offset) + offset
+        pg.draw.circle(surface, color, (round(center.x), round(center.y)), round(shape.radius), width)
+    elif isinstance(shape, pymunk.Poly):
+        points = [body.local_to_world(vertex) + offset for vertex in shape.get_vertices()]
+        if len(points) > 2:
+            pg.draw.polygon(surface, color, points, width)
+        else:
+            pg.draw.line(surface, color, points[0], points[-1])
+    elif isinstance(shape, pymunk.Segment):
+        pg.draw.line(surface, color, body.local_to_world(shape.a) + offset, body.local_to_world(shape.b) + offset,
+                     max(1, round(shape.radius * 2)))
+
+
+tile_size = 32
+# tiles with their own sprite in the atlas, static ones are baked into the static layer from the boards
+tile_collision_types = {
+    Tile.wall: CollisionMasks.walls.value,
+    Tile.goal: CollisionMasks.goals.value,
+    Tile.player: CollisionMasks.players.value,
+    Tile.movable: CollisionMasks.movable.value,
+}
+static_tiles = (Tile.wall, Tile.goal)
+
+
+def bake_tile_atlas(size: int = tile_size) -> pg.Surface:
+    """
+    One transparent size x size sprite per Tile, side by side in Tile value order. Air stays empty.
+    """
+    atlas = pg.Surface((size * len(tiles_by_value), size), pg.SRCALPHA)
+    for tile, collision_type in tile_collision_types.items():
+        color = shape_colors[collision_type]
+        cell = pg.Rect(tile.value * size, 0, size, size)
+        if tile is Tile.wall:
+            atlas.fill(color, cell)
+        elif tile is Tile.movable:
+            atlas.fill(color, cell.inflate(-size // 8, -size // 8))
+        else:
+            pg.draw.circle(atlas, color, cell.center, size // 2)
+    return atlas
+
+
+class TileAtlas:
+    """
+    Tile sprites in one surface, so many tiles are drawn with a single Surface.blits call.
+    """
+
+    def __init__(self, surface: pg.Surface, size: int = tile_size):
+        self.surface = surface
+        self.size = size
+        self.areas = [pg.Rect(tile.value * size, 0, size, size) for tile in tiles_by_value]
+
+    def blit_cells(self, target: pg.Surface, cells: Iterable[tuple[int, int, Tile]], row_offset: int = 0):
+        """
+        Blit (row, col, tile) cells to their place on target, rows shifted down by row_offset.
+        """
+        size, surface, areas = self.size, self.surface, self.areas
+        target.blits([(surface, (col * size, (row + row_offset) * size), areas[tile.value])
+                      for row, col, tile in cells], False)
+
+    def blit_board(self, target: pg.Surface, board: TileBoard, tiles: Iterable[Tile], row_offset: int = 0,
+                   origin: tuple[int, int] = (0, 0)):
+        """
+        Blit every cell of board holding one of tiles that falls inside target, scanning only those rows and columns.
+        origin is the world position of the top left corner of target.
+        """
+        size, surface, areas = self.size, self.surface, self.areas
+        x, y = origin
+        first_row = max(y // size - row_offset, 0)
+        last_row = min(-(-(y + target.get_height()) // size) - row_offset, board.height)
+        first_col = max(x // size, 0)
+        last_col = min(-(-(x + target.get_width()) // size), board.width)
+        table = bytearray(256)
+        for tile in tiles:
+            table[tile.value] = 1
+        if first_row >= last_row or first_col >= last_col:
+            return
+        # a window works the same for boards in memory and for chunked ones that decode only what is seen
+        window = board.window(first_row, first_col, last_row - first_row, last_col - first_col)
+        sequence = []
+        for row in range(window.height):
+            line = window.row(row).tobytes()
+            mask = line.translate(table)
+            target_y = (first_row + row + row_offset) * size - y
+            sequence += [(surface, ((first_col + col) * size - x, target_y), areas[line[col]])
+                         for col in compress(range(window.width), mask)]
+        target.blits(sequence, False)
+
+
+def default_atlas() -> TileAtlas:
+    from ..assets import manager
+
+    return TileAtlas(manager.get("tiles"))
+
+
+class LevelRenderer:
+    """
+    Draws what the camera sees: static geometry from cached chunks, then shapes of dynamic bodies
+    found with a bounding box query of the viewport, so draw cost follows what is visible and not level size.
+    Chunks are chunk_size pixel squares of the world rendered on first sight, at most max_chunks are kept.
+    With use_atlas static tiles are baked into chunks from the level boards, blitting atlas sprites in a batch,
+    and shapes only draw what has no tile, like level boundaries.
+    """
+    use_atlas: bool = True
+    chunk_size: int = 512
+    max_chunks: int = 16
+
+    def __init__(self, level: PymunkLevel, atlas: TileAtlas | None = None, camera: Camera | None = None):
+        self.level = level
+        self.atlas = atlas
+        info = level.raw_level.level_info
+        self.world_size = (info.width * tile_size + 1, info.height * tile_size + 1)
+        self.camera = camera
+        self.chunks: OrderedDict[tuple[int, int], pg.Surface] = OrderedDict()
+        self.built_for: tuple[int, int] | None = None
+        self.drawn_shapes = 0
+        # shapes of every category, bounding box queries skip shapes the filter does not collide with
+        self.query_filter = pymunk.ShapeFilter()
+
+    def invalidate(self):
+        """
+        Drop cached chunks, they are rendered again when seen.
+        """
+        self.chunks.clear()
+
+    def set_viewport(self, size: tuple[int, int]):
+        """
+        Look through a size sized camera, a new camera starts centered on the players.
+        """
+        self.built_for = size
+        if self.camera is None:
+            self.camera = Camera(size, self.world_size)
+            center = shapes_center(self.level.players)
+            if center is not None:
+                self.camera.center_on(center)
+        else:
+            self.camera.size = size
+            self.camera.clamp()
+
+    def follow_players(self, delta_time: float):
+        center = shapes_center(self.level.players)
+        if self.camera is not None and center is not None:
+            self.camera.follow(center, delta_time)
+
+    def visible_chunks(self) -> list[tuple[int, int]]:
+        viewport, size = self.camera.viewport, self.chunk_size
+        last_x = min(viewport.right, self.world_size[0]) - 1
+        last_y = min(viewport.top, self.world_size[1]) - 1
+        return [(x, y) for y in range(int(viewport.bottom) // size, int(last_y) // size + 1)
+                for x in range(int(viewport.left) // size, int(last_x) // size + 1)]
+
+    def build_chunk(self, key: tuple[int, int]) -> pg.Surface:
+        """
+        Render static shapes of one chunk into a transparent surface.
+        Does not need a display, so it can run before the window exists.
+        """
+        size = self.chunk_size
+        origin = (key[0] * size, key[1] * size)
+        layer = pg.Surface((min(size, self.world_size[0] - origin[0]), min(size, self.world_size[1] - origin[1])),
+                           pg.SRCALPHA)
+        area = pymunk.BB(origin[0], origin[1], origin[0] + layer.get_width(), origin[1] + layer.get_height())
+        skipped_types = set()
+        if self.use_atlas:
+            if self.atlas is None:
+                self.atlas = default_atlas()
+            raw_level = self.level.raw_level
+            self.atlas.blit_board(layer, raw_level.upper_board, static_tiles, 0, origin)
+            self.atlas.blit_board(layer, raw_level.lower_board, static_tiles, self.level.lower_offset, origin)
+            skipped_types = {tile_collision_types[tile] for tile in static_tiles}
+        offset = (-origin[0], -origin[1])
+        for space in self.level.spaces:
+            for shape in space.bb_query(area, self.query_filter):
+                if shape.body.body_type == pymunk.Body.STATIC and shape.collision_type not in skipped_types:
+                    draw_shape(layer, shape, offset)
+        return layer
+
+    def chunk(self, key: tuple[int, int]) -> pg.Surface:
+        layer = self.chunks.get(key)
+        if layer is None:
+            layer = self.chunks[key] = self.build_chunk(key)
+            while len(self.chunks) > self.max_chunks:
+                self.chunks.popitem(last=False)
+        else:
+            self.chunks.move_to_end(key)
+        return layer
+
+    def build_static_layer(self, size: tuple[int, int]):
+        """
+        Render every chunk a size sized camera sees, so the first frames do not have to.
+        """
+        self.set_viewport(size)
+        for key in self.visible_chunks():
+            self.chunk(key)
+
+    def draw(self, surface: pg.Surface):
+        if self.built_for != surface.get_size():
+            self.set_viewport(surface.get_size())
+        camera, size = self.camera, self.chunk_size
+        offset = camera.offset
+        surface.blits([(self.chunk(key), (key[0] * size + offset[0], key[1] * size + offset[1]))
+                       for key in self.visible_chunks()], False)
+        self.drawn_shapes = 0
+        for space in self.level.spaces:
+            for shape in space.bb_query(camera.viewport, self.query_filter):
+                if shape.body.body_type != pymunk.Body.STATIC:
+                    draw_shape(surface, shape, offset)
+                    self.drawn_shapes += 1
+
+
+__all__ = ["LevelRenderer", "TileAtlas", "bake_tile_atlas", "draw_shape", "shape_colors"]
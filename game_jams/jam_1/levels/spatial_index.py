@@ -0,0 +1,223 @@
+"""
+Spatial index over the tiles of a TileBoard, for neighbourhood and region queries without scanning the board.
+"""
+from __future__ import annotations
+
+from typing import Iterable
+
+from .raw_level import Tile, TileBoard, tiles_by_value
+
+# air fills most of a board, it is answered from the board itself instead of being indexed
+indexed_tiles = tuple(tile for tile in tiles_by_value if tile is not Tile.air)
+
+
+class SpatialIndex:
+    """
+    Coordinate set per tile type, plus the same coordinates bucketed into square chunks of chunk_size tiles.
+    Keep the board and the index in sync by changing tiles through set_tile().
+    """
+
+    def __init__(self, board: TileBoard, chunk_size: int = 16):
+        self.board = board
+        self.chunk_size = chunk_size
+        self.chunk_rows = -(-board.height // chunk_size)
+        self.chunk_cols = -(-board.width // chunk_size)
+        self.positions: dict[Tile, set[tuple[int, int]]] = {tile: set() for tile in indexed_tiles}
+        self.chunks: dict[Tile, dict[tuple[int, int], set[tuple[int, int]]]] = {tile: {} for tile in indexed_tiles}
+        for tile in indexed_tiles:
+            positions = board.positions(tile)
+            self.positions[tile].update(positions)
+            chunks = self.chunks[tile]
+            for row_index, col_index in positions:
+                key = (row_index // chunk_size, col_index // chunk_size)
+                if key not in chunks:
+                    chunks[key] = set()
+                chunks[key].add((row_index, col_index))
+
+    def set_tile(self, row_index: int, col_index: int, tile: Tile):
+        """
+        Change one tile of the board and update the index to match.
+        """
+        old = self.board.get(row_index, col_index)
+        if old is tile:
+            return
+        self.board.set(row_index, col_index, tile)
+        position = (row_index, col_index)
+        key = (row_index // self.chunk_size, col_index // self.chunk_size)
+        if old is not Tile.air:
+            self.positions[old].discard(position)
+            chunk = self.chunks[old][key]
+            chunk.discard(position)
+            if not chunk:
+                del self.chunks[old][key]
+        if tile is not Tile.air:
+            self.positions[tile].add(position)
+            self.chunks[tile].setdefault(key, set()).add(position)
+
+    def count(self, tile: Tile) -> int:
+        if tile is Tile.air:
+            return self.board.width * self.board.height - sum(map(len, self.positions.values()))
+        return len(self.positions[tile])
+
+    def region(self, top: int, left: int, bottom: int, right: int,
+               tiles: Iterable[Tile] = indexed_tiles) -> list[tuple[int, int, Tile]]:
+        """
+        (row, col, tile) of cells holding one of tiles inside rows top..bottom and columns left..right, ends excluded.
+        Air can be asked for too, its cells are read from the board.
+        """
+        top, left = max(top, 0), max(left, 0)
+        bottom, right = min(bottom, self.board.height), min(right, self.board.width)
+        ret = []
+        if top >= bottom or left >= right:
+            return ret
+        size = self.chunk_size
+        chunk_keys = [(chunk_row, chunk_col)
+                      for chunk_row in range(top // size, (bottom - 1) // size + 1)
+                      for chunk_col in range(left // size, (right - 1) // size + 1)]
+        for tile in tiles:
+            if tile is Tile.air:
+                board = self.board
+                for row_index in range(top, bottom):
+                    row = board.row(row_index)
+                    ret.extend((row_index, col_index, tile)
+                               for col_index in range(left, right) if row[col_index] == 0)
+                continue
+            chunks = self.chunks[tile]
+            for key in chunk_keys:
+                chunk = chunks.get(key)
+                if chunk:
+                    ret.extend((row_index, col_index, tile) for row_index, col_index in chunk
+                               if top <= row_index < bottom and left <= col_index < right)
+        return ret
+
+    def around(self, row_index: int, col_index: int, radius: int,
+               tiles: Iterable[Tile] = indexed_tiles) -> list[tuple[int, int, Tile]]:
+        """
+        Cells holding one of tiles at most radius tiles away in each direction.
+        """
+        return self.region(row_index - radius, col_index - radius, row_index + radius + 1, col_index + radius + 1, tiles)
+
+    def nearest(self, tile: Tile, row_index: int, col_index: int,
+                max_distance: float | None = None) -> tuple[int, int] | None:
+        """
+        Closest cell holding tile by straight line distance, searching chunk rings outwards from the given cell.
+        """
+        if tile is Tile.air:
+            raise ValueError("nearest air is not indexed")
+        chunks = self.chunks[tile]
+        if not chunks:
+            return None
+        size = self.chunk_size
+        center_row, center_col = row_index // size, col_index // size
+        max_ring = max(center_row, self.chunk_rows - 1 - center_row, center_col, self.chunk_cols - 1 - center_col)
+        best = None
+        best_distance = float("inf") if max_distance is None else max_distance * max_distance
+        for ring in range(max_ring + 1):
+            # every cell of a chunk on this ring is at least this far away along one axis
+            closest = (ring - 1) * size + 1 if ring else 0
+            if closest * closest > best_distance:
+                break
+            for key in _ring(center_row, center_col, ring):
+                chunk = chunks.get(key)
+                if not chunk:
+                    continue
+                for position in chunk:
+                    distance = (position[0] - row_index) ** 2 + (position[1] - col_index) ** 2
+                    if distance < best_distance or (distance == best_distance and (best is None or position < best)):
+                        best, best_distance = position, distance
+        return best
+
+    def flood_fill(self, row_index: int, col_index: int, passable: Iterable[Tile] | None = None,
+                   max_cells: int | None = None) -> list[tuple[int, int, int]]:
+        return flood_fill(self.board, row_index, col_index, passable, max_cells)
+
+    def reachable(self, start: tuple[int, int], targets: Iterable[tuple[int, int]],
+                  passable: Iterable[Tile] | None = None) -> bool:
+        """
+        True when all targets are in the flood fill region of start.
+        """
+        targets = set(targets)
+        return covered(self.flood_fill(start[0], start[1], passable), targets) == targets
+
+
+def flood_fill(board: TileBoard, row_index: int, col_index: int, passable: Iterable[Tile] | None = None,
+               max_cells: int | None = None) -> list[tuple[int, int, int]]:
+    """
+    Cells connected to the given one through side by side passable tiles, as (row, start_col, stop_col) spans.
+    passable defaults to everything but walls. Stops early once more than max_cells were filled.
+    """
+    width, height = board.width, board.height
+    if passable is None:
+        passable = [tile for tile in tiles_by_value if tile is not Tile.wall]
+    table = bytearray(256)
+    for tile in passable:
+        table[tile.value] = 1
+    if not (0 <= row_index < height and 0 <= col_index < width) or not table[board.view[row_index * width + col_index]]:
+        return []
+    rows: dict[int, bytes] = {}
+    filled: dict[int, bytearray] = {}
+
+    def mask(index: int) -> bytes:
+        if index not in rows:
+            rows[index] = board.row(index).tobytes().translate(table)
+            filled[index] = bytearray(width)
+        return rows[index]
+
+    spans = []
+    cells = 0
+    stack = [(row_index, col_index)]
+    while stack:
+        row, col = stack.pop()
+        row_mask = mask(row)
+        if filled[row][col] or not row_mask[col]:
+            continue
+        start = row_mask.rfind(0, 0, col) + 1
+        stop = row_mask.find(0, col)
+        if stop == -1:
+            stop = width
+        filled[row][start:stop] = b"\x01" * (stop - start)
+        spans.append((row, start, stop))
+        cells += stop - start
+        if max_cells is not None and cells > max_cells:
+            break
+        for next_row in (row - 1, row + 1):
+            if 0 <= next_row < height:
+                next_mask = mask(next_row)
+                next_filled = filled[next_row]
+                col = start
+                while col < stop:
+                    if next_mask[col] and not next_filled[col]:
+                        stack.append((next_row, col))
+                        # one seed per run of passable cells
+                        while col < stop and next_mask[col]:
+                            col += 1
+                    else:
+                        col += 1
+    return spans
+
+
+def covered(spans: Iterable[tuple[int, int, int]], positions: Iterable[tuple[int, int]]) -> set[tuple[int, int]]:
+    """
+    Those of positions that lie inside spans of a flood fill.
+    """
+    rows: dict[int, list[tuple[int, int]]] = {}
+    for row, start, stop in spans:
+        rows.setdefault(row, []).append((start, stop))
+    return {(row, col) for row, col in positions
+            if any(start <= col < stop for start, stop in rows.get(row, ()))}
+
+
+def _ring(center_row: int, center_col: int, ring: int) -> list[tuple[int, int]]:
+    """
+    Chunk keys at Chebyshev distance ring from the center chunk.
+    """
+    if ring == 0:
+        return [(center_row, center_col)]
+    top, bottom = center_row - ring, center_row + ring
+    left, right = center_col - ring, center_col + ring
+    keys = [(top, col) for col in range(left, right + 1)] + [(bottom, col) for col in range(left, right + 1)]
+    keys += [(row, left) for row in range(top + 1, bottom)] + [(row, right) for row in range(top + 1, bottom)]
+    return keys
+
+
+__all__ = ["SpatialIndex", "covered", "flood_fill", "indexed_tiles"]
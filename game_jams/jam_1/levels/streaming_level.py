@@ -0,0 +1,205 @@
+"""
+PymunkLevel over a chunked level file, colliders of a chunk exist only while a player is near it.
+"""
+from __future__ import annotations
+
+import pymunk
+
+from .chunked_level import ChunkedLevel
+from .convert_level import PymunkLevel, merge_tiles, shared
+from .raw_level import Tile, TileBoard
+
+
+class StreamingLevel(PymunkLevel):
+    """
+    Chunks within load_distance tiles of a player are added to the space, chunks farther than unload_distance
+    tiles from every player are removed, chunks in between keep their state so a player walking along
+    a chunk edge does not load and unload it every step.
+
+    Walls and goals of a chunk are added again each time it loads. Movables are created the first time
+    their chunk loads and from then on belong to the level; a movable inside a chunk that is not loaded
+    is taken out of the space, where it neither moves nor costs a step, and put back with its chunk.
+    Players are created up front from the level header and keep their chunks loaded.
+    Loading is spread over steps, at most max_loads_per_step chunks each, so a step never pays for many chunks.
+    """
+    load_distance: int = 32
+    unload_distance: int = 64
+    max_loads_per_step: int = 1
+
+    def __init__(self, level: ChunkedLevel, load_distance: int | None = None, unload_distance: int | None = None,
+                 **level_options):
+        if load_distance is not None:
+            self.load_distance = load_distance
+        if unload_distance is not None:
+            self.unload_distance = unload_distance
+        if self.unload_distance < self.load_distance:
+            raise ValueError("unload_distance must not be smaller than load_distance")
+        self.chunk_size = level.chunk_size
+        # static shapes of each loaded chunk, by (board, chunk_col, chunk_row)
+        self.loaded: dict[tuple[int, int, int], list[pymunk.Shape]] = {}
+        # bodies hold their shapes weakly, once out of the space only this list keeps them alive
+        self.parked: dict[tuple[int, int, int], list[tuple[pymunk.Body, list[pymunk.Shape]]]] = {}
+        self._spawned: set[tuple[int, int, int]] = set()
+        self._streamed_for: tuple[tuple[int, int], ...] | None = None
+        self.loads = 0
+        self.unloads = 0
+        super().__init__(level, **level_options)
+        self.goal_tracker.total = level.goal_count
+
+    def populate_space(self, progress=None):
+        """
+        Add players and level boundaries, then the chunks around players.
+        """
+        progress = progress or (lambda fraction: None)
+        for row_index, col_index in self.raw_level.players:
+            self.add_player(row_index, col_index, self._board_space(int(row_index >= self.lower_offset)))
+        if self.layout == shared:
+            self.add_level_boundaries()
+            self.add_movable_go_through_boundary()
+        else:
+            self.add_level_boundaries(self.space, 0, self.lower_offset)
+            self.add_level_boundaries(self.lower_space, self.lower_offset, self.raw_level.lower_board.height)
+        progress(0.5)
+        # loading chunks keeps these up to date, PymunkLevel.__init__ only sets them once populate_space returns
+        self.dynamic_bodies = [[body for body in space.bodies if body.body_type == pymunk.Body.DYNAMIC]
+                               for space in self.spaces]
+        self._space_resting = [False] * len(self.spaces)
+        self._awake_hint = [None] * len(self.spaces)
+        self.stream(max_loads=len(self.chunks_near(self.load_distance)))
+        progress(1.0)
+
+    def _board_space(self, board: int) -> pymunk.Space:
+        return self.spaces[min(board, len(self.spaces) - 1)]
+
+    def player_tiles(self) -> tuple[tuple[int, int], ...]:
+        """
+        (row, col) of the tile under the center of every player.
+        """
+        tiles = []
+        for shape in self.players:
+            bb = shape.bb
+            tiles.append((int((bb.bottom + bb.top) / 2) // 32, int((bb.left + bb.right) / 2) // 32))
+        return tuple(sorted(tiles))
+
+    def chunk_at(self, row_index: int, col_index: int) -> tuple[int, int, int]:
+        """
+        Key of the chunk holding a tile of the level, rows of the lower board follow the upper board.
+        """
+        board = int(row_index >= self.lower_offset)
+        row_index -= board * self.lower_offset
+        level = self.raw_level
+        return (board, min(max(col_index // self.chunk_size, 0), level.chunk_cols - 1),
+                min(max(row_index // self.chunk_size, 0), level.chunk_rows - 1))
+
+    def chunks_near(self, distance: int) -> set[tuple[int, int, int]]:
+        """
+        Chunks with a tile at most distance tiles away from a player, along rows and columns.
+        """
+        level, size = self.raw_level, self.chunk_size
+        keys = set()
+        for row_index, col_index in self.player_tiles():
+            cols = range(max((col_index - distance) // size, 0),
+                         min((col_index + distance) // size, level.chunk_cols - 1) + 1)
+            for board, offset in ((0, 0), (1, self.lower_offset)):
+                row = row_index - offset
+                rows = range(max((row - distance) // size, 0),
+                             min((row + distance) // size, level.chunk_rows - 1) + 1)
+                keys.update((board, chunk_col, chunk_row) for chunk_row in rows for chunk_col in cols)
+        return keys
+
+    def stream(self, max_loads: int | None = None):
+        """
+        Load and unload chunks for where players are now, nearest chunks first and at most max_loads of them
+        (max_loads_per_step by default), the rest on later calls. Does nothing while no player changed tile.
+        """
+        tiles = self.player_tiles()
+        if tiles == self._streamed_for:
+            return
+        kept = self.chunks_near(self.unload_distance)
+        unloaded = [key for key in self.loaded if key not in kept]
+        for key in unloaded:
+            self.unload_chunk(key)
+        pending = sorted(self.chunks_near(self.load_distance) - self.loaded.keys(), key=self._chunk_distance)
+        max_loads = self.max_loads_per_step if max_loads is None else max_loads
+        for key in pending[:max_loads]:
+            self.load_chunk(key)
+        if len(pending) <= max_loads:
+            self._streamed_for = tiles
+        if unloaded:
+            self.park_bodies()
+
+    def _chunk_distance(self, key: tuple[int, int, int]) -> int:
+        board, chunk_col, chunk_row = key
+        size = self.chunk_size
+        return min(max(abs(chunk_col - col_index // size),
+                       abs(chunk_row - (row_index - board * self.lower_offset) // size))
+                   for row_index, col_index in self.player_tiles())
+
+    def load_chunk(self, key: tuple[int, int, int]):
+        board, chunk_col, chunk_row = key
+        chunk: TileBoard | None = self.raw_level.chunk(board, chunk_col, chunk_row)
+        space = self._board_space(board)
+        row_offset = chunk_row * self.chunk_size + board * self.lower_offset
+        col_offset = chunk_col * self.chunk_size
+        shapes = []
+        if chunk is not None:
+            if self.merge_walls:
+                for row_index, col_index, rows, cols in merge_tiles(chunk, Tile.wall):
+                    shapes.append(self.add_wall_rect(row_index + row_offset, col_index + col_offset, rows, cols,
+                                                     space))
+            else:
+                for row_index, col_index in chunk.positions(Tile.wall):
+                    shapes.append(self.add_wall(row_index + row_offset, col_index + col_offset, space))
+            for row_index, col_index in chunk.positions(Tile.goal):
+                shapes.append(self.add_goal(row_index + row_offset, col_index + col_offset, space))
+            if key not in self._spawned:
+                for row_index, col_index in chunk.positions(Tile.movable):
+                    self.dynamic_bodies[self.spaces.index(space)].append(
+                        self.add_movable(row_index + row_offset, col_index + col_offset, space))
+        self._spawned.add(key)
+        self.loaded[key] = shapes
+        for body, body_shapes in self.parked.pop(key, ()):
+            space.add(body, *body_shapes)
+            self.dynamic_bodies[self.spaces.index(space)].append(body)
+        self._space_resting[self.spaces.index(space)] = False
+        self.loads += 1
+
+    def unload_chunk(self, key: tuple[int, int, int]):
+        shapes = self.loaded.pop(key)
+        for shape in shapes:
+            if shape in self.goals:
+                self.goals.discard(shape)
+                self.goal_tracker.remove_goal(shape)
+        if shapes:
+            self._board_space(key[0]).remove(*shapes)
+        self.unloads += 1
+
+    def park_bodies(self):
+        """
+        Take movables that are outside loaded chunks out of their space, run after chunks unload.
+        """
+        for index, space in enumerate(self.spaces):
+            kept = []
+            for body in self.dynamic_bodies[index]:
+                bb = next(iter(body.shapes)).bb
+                key = self.chunk_at(int((bb.bottom + bb.top) / 2) // 32, int((bb.left + bb.right) / 2) // 32)
+                if key in self.loaded or any(shape in self.players for shape in body.shapes):
+                    kept.append(body)
+                    continue
+                shapes = list(body.shapes)
+                space.remove(body, *shapes)
+                self.parked.setdefault(key, []).append((body, shapes))
+            if len(kept) != len(self.dynamic_bodies[index]):
+                self.dynamic_bodies[index] = kept
+                self._awake_hint[index] = None
+
+    def step(self):
+        super().step()
+        self.stream()
+
+    @property
+    def static_shapes(self) -> int:
+        return sum(map(len, self.loaded.values()))
+
+
+__all__ = ["StreamingLevel"]
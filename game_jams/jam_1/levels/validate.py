@@ -0,0 +1,186 @@
+"""
+Check level files for format errors and search each board for a way from a player to every goal.
+
+The search works on a grid model of a board: players move between side by side tiles, walls block
+them and movables are treated as pushable, so they do not block. That makes a passed search a
+necessary condition for a solvable level, a failed one proves the level can not be solved.
+A passed level is reported as "reachable", not as solvable: a movable that can not actually be
+pushed out of the way still blocks it in the game.
+
+Run as "python -m game_jams.jam_1.levels.validate [levels_dir]".
+"""
+from __future__ import annotations
+
+import argparse
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from .raw_level import Tile, TileBoard, default_levels_dir, level_file_name_format
+from .spatial_index import covered, flood_fill
+
+reachable = "reachable"  # every goal reachable in the grid model, not disproven
+unsolvable = "unsolvable"
+unknown = "unknown"
+
+valid_cells = {str(tile.value) for tile in Tile}
+
+
+class LevelReport:
+    def __init__(self, path: Path):
+        self.path = path
+        self.errors: list[str] = []
+        self.search: str = unknown
+        self.visited = 0
+        self.time = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors and self.search == reachable
+
+    def __str__(self):
+        status = "ok" if self.ok else "FAIL"
+        line = f"{self.path.name:<24} {status:<5} {self.search:<11} {self.visited:>8} tiles  {self.time * 1000:8.2f} ms"
+        return "\n".join([line] + [f"    {error}" for error in self.errors])
+
+
+def parse_number(text: str) -> int | None:
+    """
+    text as a non-negative int, None when it is not one. Only ascii digits count, str.isdigit alone also takes
+    characters like "²" that int() then rejects.
+    """
+    text = text.strip()
+    if not (text.isascii() and text.isdigit()):
+        return None
+    return int(text)
+
+
+def parse_board(name: str, text: str, width: int, height: int, report_errors: list[str]) -> TileBoard | None:
+    errors = []
+    rows = [line.split(",") for line in text.split("\n")]
+    if len(rows) != height:
+        errors.append(f"{name} board has {len(rows)} rows, header says {height}")
+    for row_index, row in enumerate(rows):
+        if len(row) != width:
+            errors.append(f"{name} board row {row_index} has {len(row)} tiles, header says {width}")
+        if valid_cells.issuperset(row):
+            continue
+        for col_index, cell in enumerate(row):
+            value = parse_number(cell)
+            if value is None or value >= len(Tile):
+                errors.append(f"{name} board tile ({row_index}, {col_index}) is not a valid tile: {cell!r}")
+    if errors:
+        report_errors.extend(errors)
+        return None
+    return TileBoard.from_rows(rows)
+
+
+def search_board(board: TileBoard, max_visited: int) -> tuple[str, int]:
+    """
+    Flood fill from every player not yet inside an earlier fill, stops once every goal was reached.
+    """
+    goals = set(board.positions(Tile.goal))
+    players = board.positions(Tile.player)
+    if not goals or not players:
+        return unsolvable, 0
+    spans: list[tuple[int, int, int]] = []
+    visited = 0
+    for player in players:
+        if covered(spans, [player]):
+            continue
+        filled = flood_fill(board, player[0], player[1], max_cells=max_visited - visited)
+        visited += sum(stop - start for _, start, stop in filled)
+        if visited > max_visited:
+            return unknown, visited
+        spans += filled
+        goals -= covered(filled, goals)
+        if not goals:
+            break
+    return (unsolvable if goals else reachable), visited
+
+
+def check_level(path: Path, max_visited: int = 1_000_000) -> LevelReport:
+    """
+    Validate one level file and search both of its boards.
+    """
+    report = LevelReport(path)
+    start = time.perf_counter()
+    try:
+        text = path.read_text()
+    except (OSError, UnicodeDecodeError) as e:
+        report.errors.append(f"can not read file: {e}")
+        report.time = time.perf_counter() - start
+        return report
+
+    header, _, body = text.partition("\n")
+    info = header.split(",")
+    width = height = 0
+    if len(info) != 4:
+        report.errors.append(f"header has {len(info)} fields, expected title,theme,width,height")
+    elif not (parse_number(info[2]) and parse_number(info[3])):
+        report.errors.append(f"header width and height must be positive numbers: {info[2]!r}, {info[3]!r}")
+    else:
+        width, height = parse_number(info[2]), parse_number(info[3])
+
+    boards = body.split("\n!\n")
+    if len(boards) != 2:
+        report.errors.append(f"expected 2 boards separated by '!', found {len(boards)}")
+    elif width and height:
+        results = []
+        for name, board_text in zip(("upper", "lower"), boards):
+            board = parse_board(name, board_text, width, height, report.errors)
+            if board is not None:
+                result, visited = search_board(board, max_visited)
+                report.visited += visited
+                results.append(result)
+                if result == unsolvable:
+                    report.errors.append(f"{name} board: no path from a player to every goal")
+        if len(results) == 2:
+            if unsolvable in results:
+                report.search = unsolvable
+            elif unknown in results:
+                report.search = unknown
+            else:
+                report.search = reachable
+    report.time = time.perf_counter() - start
+    return report
+
+
+def find_levels(levels_dir: Path) -> list[Path]:
+    return sorted(path for path in levels_dir.rglob("*.csv") if re.fullmatch(level_file_name_format, path.name))
+
+
+def check_levels(paths: list[Path], workers: int | None = None, max_visited: int = 1_000_000) -> list[LevelReport]:
+    """
+    Check levels on a process pool, reports keep order of paths.
+    """
+    if workers == 1 or len(paths) < 2:
+        return [check_level(path, max_visited) for path in paths]
+    with ProcessPoolExecutor(workers) as pool:
+        return list(pool.map(check_level, paths, [max_visited] * len(paths), chunksize=max(1, len(paths) // 64)))
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Validate level files and rule out levels that can not be solved.")
+    parser.add_argument("levels_dir", nargs="?", type=Path, default=default_levels_dir)
+    parser.add_argument("--workers", type=int, default=None, help="worker processes, defaults to cpu count")
+    parser.add_argument("--max-visited", type=int, default=1_000_000, help="search budget per board")
+    args = parser.parse_args(argv)
+
+    paths = find_levels(args.levels_dir)
+    start = time.perf_counter()
+    reports = check_levels(paths, args.workers, args.max_visited)
+    for report in reports:
+        print(report)
+    failed = sum(not report.ok for report in reports)
+    print(f"{len(reports)} levels, {failed} failed, {time.perf_counter() - start:.2f} s")
+    return 1 if failed else 0
+
+
+__all__ = ["LevelReport", "check_level", "check_levels", "search_board"]
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,121 +1,197 @@
 from __future__ import annotations
 
-from ..engine import BaseScene
+from ..engine import BaseScene, LoadTask, text_cache
 from .levels import listed_levels, PymunkLevel
+from .levels.goals import completed
 from .levels.raw_level import RawLevel
 from . import assets, color_permutations
 
-from typing import Callable
-
 import pygame as pg
 
 
+def prepare_level(world: int, level_num: int, screen_size: tuple[int, int], task: LoadTask) -> PymunkLevel:
+    """
+    Parse level, build its space and pre-render its static layer, runs on the loader thread.
+    """
+    raw_level = listed_levels[world][level_num]
+    task.report(0.2)
+    level = PymunkLevel(raw_level, progress=lambda fraction: task.report(0.2 + fraction * 0.6))
+    level.prepare_renderer(screen_size)
+    task.report(1.0)
+    return level
+
+
 class BaseGameScene(BaseScene):
     upper_scene: BaseScene | None
     page_name: str
 
     def init(self):
-        pg.display.set_caption(f"Top and Bottom - {self.page_name}")
+        if not self.manager.game.headless:
+            pg.display.set_caption(f"Top and Bottom - {self.page_name}")
+        self.bind(pg.KEYDOWN, self.go_back, pg.K_ESCAPE)
+
+    def level_task(self, world: int, level_num: int) -> LoadTask:
+        """
+        Task preparing level on the game's loader, shared by every scene asking for the same level.
+        """
+        size = self.manager.game.size
+        return self.manager.game.loader.load((world, level_num),
+                                             lambda task: prepare_level(world, level_num, size, task))
 
     def on_redirect_from(self, scene: BaseScene):
         self.upper_scene = scene
 
-    def on_event(self, event: pg.event.Event):
-        if event.type == pg.KEYDOWN:
-            if event.key == pg.K_ESCAPE:
-                if self.upper_scene:
-                    self.manager.set_active_scene(self.upper_scene, silent=True)
-                else:
-                    self.manager.game.stop()
+    def go_back(self, event: pg.event.Event | None = None):
+        if self.upper_scene:
+            self.manager.set_active_scene(self.upper_scene, silent=True, release=True)
+        else:
+            self.manager.game.stop()
+
+    def dispose(self):
+        self.upper_scene = None
 
 
 class SceneWithBackground(BaseGameScene):
-    color_iter: Callable[[], tuple[int, int, int]]
+    palette: color_permutations.PaletteCycle
+    background: tuple[int, int, int]
+
+    @property
+    def animated_background(self) -> bool:
+        # When False the background keeps one colour, so scenes can redraw only what changed.
+        return self.manager.game.animated_background
+
+    @property
+    def full_redraw(self) -> bool:
+        return self.animated_background
 
     def init(self):
         super().init()
-        self.color_iter = color_permutations.color_iter()
+        # one cycle per game, so the colour carries over between its scenes and not between games
+        self.palette = self.manager.game.palette
+        self.background = self.palette.color()
 
     def update(self, delta_time: float):
         super().update(delta_time)
-        if self.frame_counter.seconds % 5 == 0 and self.frame_counter.new_second:
-            self.color_iter = color_permutations.color_iter()
+        if self.animated_background:
+            self.palette.advance(delta_time)
+
+    def background_color(self) -> tuple[int, int, int]:
+        if self.animated_background:
+            self.background = self.palette.color()
+        return self.background
 
 
 class MainMenu(SceneWithBackground):
     def init(self):
         self.page_name = "Main Menu"
         super().init()
+        self.bind(pg.KEYDOWN, self.start, pg.K_RETURN)
 
-    def update(self, delta_time: float):
-        super().update(delta_time)
-        for event in self.get_events():
-            if event.type == pg.KEYDOWN:
-                if event.key == pg.K_RETURN:
-                    self.manager.spawn_scene(LevelSelectionScene)
+    def start(self, event: pg.event.Event):
+        self.manager.spawn_scene(LevelSelectionScene)
 
     def draw(self, surface: pg.Surface):
-        surface.fill(self.color_iter())
-        surface.blit(assets.font_title.render("Main Menu", True, (255, 255, 255)), (10, 10))
-        surface.blit(assets.font_text.render("Press Enter to start", True, (255, 255, 255)), (10, 50))
-        surface.blit(assets.font_text.render("Press Escape to quit", True, (255, 255, 255)), (10, 80))
+        if not (self.full_redraw or self.needs_full_redraw):
+            return []
+        surface.fill(self.background_color())
+        surface.blit(text_cache.render(assets.font_title, "Main Menu", True, (255, 255, 255)), (10, 10))
+        surface.blit(text_cache.render(assets.font_text, "Press Enter to start", True, (255, 255, 255)), (10, 50))
+        surface.blit(text_cache.render(assets.font_text, "Press Escape to quit", True, (255, 255, 255)), (10, 80))
+        return [surface.get_rect()]
 
 
 class LevelSelectionScene(SceneWithBackground):
     selected_world: int
     selected_level: int
     selecting_level: bool
+    drawn_selection: tuple[int, int, bool] | None = None
+    prefetched: tuple[int, int] | None = None
 
     def init(self):
         self.page_name = "Level Selection"
         super().init()
         self.reset_selection()
+        self.bind_keys(pg.KEYDOWN, (pg.K_w, pg.K_UP), self.select_worlds)
+        self.bind_keys(pg.KEYDOWN, (pg.K_s, pg.K_DOWN, pg.K_RETURN), self.confirm)
+        self.bind_keys(pg.KEYDOWN, (pg.K_a, pg.K_LEFT), self.select_previous)
+        self.bind_keys(pg.KEYDOWN, (pg.K_d, pg.K_RIGHT), self.select_next)
 
     def reset_selection(self):
         self.selected_world = 1
         self.selected_level = 1
         self.selecting_level = False
+        self.prefetched = None
+
+    def select_worlds(self, event: pg.event.Event):
+        self.selecting_level = False
+
+    def confirm(self, event: pg.event.Event):
+        if not self.selecting_level:
+            self.selecting_level = True
+        else:
+            task = self.level_task(self.selected_world, self.selected_level)
+            # a failed prefetch goes through LoadingScene, which shows the error and lets the next try start over
+            ready = task.done() and task.exception() is None
+            self.manager.spawn_scene(GameScene if ready else LoadingScene)
+
+    def select_previous(self, event: pg.event.Event):
+        if self.selecting_level:
+            self.selected_level -= 1
+            if self.selected_level not in listed_levels[self.selected_world]:
+                self.selected_level = max(listed_levels[self.selected_world])
+        else:
+            self.selected_world -= 1
+            if self.selected_world not in listed_levels:
+                self.selected_world = max(listed_levels)
+
+    def select_next(self, event: pg.event.Event):
+        if self.selecting_level:
+            self.selected_level += 1
+            if self.selected_level not in listed_levels[self.selected_world]:
+                self.selected_level = min(listed_levels[self.selected_world])
+        else:
+            self.selected_world += 1
+            if self.selected_world not in listed_levels:
+                self.selected_world = min(listed_levels)
 
     def update(self, delta_time: float):
         super().update(delta_time)
-        for event in self.get_events():
-            if event.type == pg.KEYDOWN:
-                if event.key in {pg.K_w, pg.K_UP}:
-                    self.selecting_level = False
-                if event.key in {pg.K_s, pg.K_DOWN, pg.K_RETURN}:
-                    if not self.selecting_level:
-                        self.selecting_level = True
-                    else:
-                        self.manager.spawn_scene(GameScene)
-                if event.key in {pg.K_a, pg.K_LEFT}:
-                    if self.selecting_level:
-                        self.selected_level -= 1
-                        if self.selected_level not in listed_levels[self.selected_world]:
-                            self.selected_level = max(listed_levels[self.selected_world])
-                    else:
-                        self.selected_world -= 1
-                        if self.selected_world not in listed_levels:
-                            self.selected_world = max(listed_levels)
-                if event.key in {pg.K_d, pg.K_RIGHT}:
-                    if self.selecting_level:
-                        self.selected_level += 1
-                        if self.selected_level not in listed_levels[self.selected_world]:
-                            self.selected_level = min(listed_levels[self.selected_world])
-                    else:
-                        self.selected_world += 1
-                        if self.selected_world not in listed_levels:
-                            self.selected_world = min(listed_levels)
+        if self.selecting_level and self.manager.current is self:
+            self.prefetch_levels()
 
-    def draw(self, surface: pg.Surface):
-        surface.fill(self.color_iter())
-        surface.blit(assets.font_title.render("Level Selection", True, (255, 255, 255)), (10, 10))
+    def checksum(self) -> int:
+        return hash((self.selected_world, self.selected_level, self.selecting_level))
 
-        for num, level in listed_levels.items():
+    def prefetch_levels(self):
+        """
+        Start preparing hovered level and its neighbours before one of them is picked.
+        """
+        if self.prefetched == (self.selected_world, self.selected_level):
+            return
+        self.prefetched = (self.selected_world, self.selected_level)
+        world = listed_levels[self.selected_world]
+        for num in (self.selected_level, self.selected_level + 1, self.selected_level - 1):
+            if num in world:
+                self.level_task(self.selected_world, num)
+
+    def draw(self, surface: pg.Surface):
+        selection = (self.selected_world, self.selected_level, self.selecting_level)
+        selection_area = pg.Rect(0, 45, surface.get_width(), surface.get_height() - 45)
+        if self.full_redraw or self.needs_full_redraw:
+            surface.fill(self.background_color())
+            surface.blit(text_cache.render(assets.font_title, "Level Selection", True, (255, 255, 255)), (10, 10))
+        elif selection == self.drawn_selection:
+            return []
+        else:
+            surface.fill(self.background, selection_area)
+        self.drawn_selection = selection
+
+        for num in listed_levels:
             if num == self.selected_world:
                 lv_rect = pg.draw.rect(surface, (255, 255, 255), (10 + (num - 1) * 45, 50, 40, 40), 5)
             else:
                 lv_rect = pg.draw.rect(surface, (255, 255, 255), (10 + (num - 1) * 45, 50, 40, 40), 3)
-            text = assets.font_text.render(str(num), True, (255, 255, 255))
+            text = text_cache.render(assets.font_text, str(num), True, (255, 255, 255))
             text_rect = text.get_rect()
             text_rect.center = lv_rect.center
             surface.blit(text, text_rect)
@@ -123,40 +199,55 @@ class LevelSelectionScene(SceneWithBackground):
         if self.selecting_level:
             world = listed_levels[self.selected_world]
 
-            for num, level in world.items():
+            for num in world:
                 if num == self.selected_level:
                     lv_rect = pg.draw.rect(surface, (255, 255, 255), (40 + (num - 1) * 45, 100, 40, 40), 5)
                     # draw level name
-                    text = assets.font_text.render(level.level_info.title, True, (255, 255, 255))
+                    text = text_cache.render(assets.font_text, world.info(num).title, True, (255, 255, 255))
                     surface.blit(text, (40, 150))
                 else:
                     lv_rect = pg.draw.rect(surface, (255, 255, 255), (40 + (num - 1) * 45, 100, 40, 40), 3)
-                text = assets.font_text.render(str(num), True, (255, 255, 255))
+                text = text_cache.render(assets.font_text, str(num), True, (255, 255, 255))
                 text_rect = text.get_rect()
                 text_rect.center = lv_rect.center
                 surface.blit(text, text_rect)
 
+        return [selection_area]
+
 
 class GameScene(SceneWithBackground):
-    raw_level: RawLevel
-    pymunk_level: PymunkLevel
+    raw_level: RawLevel | None
+    pymunk_level: PymunkLevel | None
     surface: pg.Surface | None
+    full_redraw = True
 
     def init(self):
         self.page_name = "Game"
         super().init()
         self.surface = None
+        self.bind(pg.KEYDOWN, self.wake_level)
+        self.bind(pg.MOUSEBUTTONDOWN, self.wake_level)
+
+    def wake_level(self, event: pg.event.Event):
+        if self.pymunk_level is not None:
+            self.pymunk_level.wake()
 
     def update(self, delta_time: float):
         super().update(delta_time)
-        for event in self.get_events():
-            if event.type == pg.KEYDOWN:
-                pass
-
+        self.manager.game.profiler.start("physics")
         self.pymunk_level.tick(delta_time)
+        self.manager.game.profiler.stop("physics")
+        self.pymunk_level.follow_players(delta_time)
+        for kind, goal in self.pymunk_level.goal_tracker.poll():
+            if kind == completed:
+                self.go_back()
+                return
+
+    def checksum(self) -> int:
+        return self.pymunk_level.checksum()
 
     def draw(self, surface: pg.Surface):
-        surface.fill(self.color_iter())
+        surface.fill(self.background_color())
         if surface is not self.surface:
             self.surface = surface
             self.pymunk_level.set_pygame_screen(surface)
@@ -165,9 +256,64 @@ class GameScene(SceneWithBackground):
 
     def on_redirect_from(self, scene: BaseScene):
         super().on_redirect_from(scene)
-        if not isinstance(scene, LevelSelectionScene):
+        if isinstance(scene, LoadingScene):
+            self.upper_scene = scene.upper_scene
+        elif not isinstance(scene, LevelSelectionScene):
             # Go back to that scene
             self.manager.set_active_scene(scene, silent=True)
             return
-        self.raw_level = listed_levels[scene.selected_world][scene.selected_level]
-        self.pymunk_level = PymunkLevel(self.raw_level)
+        selection = self.upper_scene
+        task = self.level_task(selection.selected_world, selection.selected_level)
+        # each play gets its own space, next load of this level prepares a fresh one
+        self.manager.game.loader.pop(task.key)
+        self.pymunk_level = task.result()
+        self.raw_level = self.pymunk_level.raw_level
+
+    def dispose(self):
+        super().dispose()
+        self.raw_level = None
+        self.pymunk_level = None
+        self.surface = None
+
+
+class LoadingScene(SceneWithBackground):
+    task: LoadTask | None
+    # progress changes every frame, so redraw even when the background does not animate
+    full_redraw = True
+
+    def init(self):
+        self.page_name = "Loading"
+        super().init()
+        self.task = None
+
+    def on_redirect_from(self, scene: BaseScene):
+        super().on_redirect_from(scene)
+        if not isinstance(scene, LevelSelectionScene):
+            self.manager.set_active_scene(scene, silent=True)
+            return
+        self.task = self.level_task(scene.selected_world, scene.selected_level)
+
+    def update(self, delta_time: float):
+        super().update(delta_time)
+        if self.task is not None and self.task.done():
+            if self.task.exception() is None:
+                self.manager.spawn_scene(GameScene, release=True)
+            else:
+                # let the next attempt start over
+                self.manager.game.loader.pop(self.task.key)
+
+    def draw(self, surface: pg.Surface):
+        surface.fill(self.background_color())
+        if self.task is not None and self.task.exception() is not None:
+            message = "Could not load level, press Escape"
+        else:
+            message = "Loading..."
+        surface.blit(text_cache.render(assets.font_title, message, True, (255, 255, 255)), (10, 10))
+        progress = self.task.progress if self.task is not None else 0.0
+        bar = pg.Rect(10, 60, surface.get_width() - 20, 20)
+        pg.draw.rect(surface, (255, 255, 255), bar, 2)
+        pg.draw.rect(surface, (255, 255, 255), (bar.x, bar.y, round(bar.width * progress), bar.height))
+
+    def dispose(self):
+        super().dispose()
+        self.task = None
@@ -1,14 +1,34 @@
 import sys
 import game_jams
 
-
-def run_jam(jam_id: int):
-    game_jams.game_jams[jam_id]()
+jams = game_jams.all_jams()
 
 
-if len(sys.argv) > 1:
+def run_jam(jam_id: int):
+    # ids shown to the user start at 1
+    jams[jam_id - 1]()
+
+
+def import_report(jam_id: int):
+    """
+    Print how long importing a jam takes and which packages it pulls in.
+    For every module's share run "python -X importtime main.py --import-report <id>".
+    """
+    before = set(sys.modules)
+    entry = jams[jam_id - 1]
+    entry.load()
+    loaded = set(sys.modules) - before
+    print(f"{entry.title}: {len(loaded)} modules imported in {entry.import_time * 1000:.1f} ms")
+    print("packages: " + ", ".join(sorted({name.split(".")[0] for name in loaded if not name.startswith("_")})))
+
+
+if len(sys.argv) > 2 and sys.argv[1] == "--import-report":
+    import_report(int(sys.argv[2]))
+elif len(sys.argv) > 1:
     run_jam(int(sys.argv[1]))
 else:
+    for jam_id, jam in enumerate(jams, 1):
+        print(f"{jam_id}: {jam.title}")
     selected = input("Select a jam id: ")
 
     # check if the selected id is a valid int.
@@ -18,9 +38,9 @@ else:
 
     selected = int(selected)
 
-    if not 1 <= selected <= len(game_jams.game_jams):
+    if not 1 <= selected <= len(jams):
         print("Invalid jam id.")
-        print("Available jam ids: 1-" + str(len(game_jams.game_jams)))
+        print("Available jam ids: 1-" + str(len(jams)))
         exit()
 
     run_jam(selected)
@@ -0,0 +1,27 @@
+from __future__ import annotations
+
+from random import Random
+
+from game_jams.jam_1.levels.generate import generate_board
+from game_jams.jam_1.levels.raw_level import Tile
+
+
+def test_dense_board_keeps_player_and_goal():
+    for seed in range(20):
+        board = generate_board(8, 8, Random(seed), density={Tile.wall: 1.0}, counts={Tile.movable: 200})
+        assert board.count(Tile.player) == 1
+        assert board.count(Tile.goal) == 1
+        # the floor is never given away
+        assert all(tile == Tile.wall.value for tile in board.row(7))
+
+
+def test_items_do_not_overwrite_each_other():
+    board = generate_board(4, 3, Random(0), counts={Tile.player: 2, Tile.goal: 2, Tile.movable: 100})
+    assert board.count(Tile.player) == 2
+    assert board.count(Tile.goal) == 2
+
+
+def test_single_row_board_has_no_floor():
+    board = generate_board(6, 1, Random(0), density={Tile.wall: 1.0}, counts={Tile.movable: 10})
+    assert board.count(Tile.player) == 1
+    assert board.count(Tile.goal) == 1
@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+from game_jams.jam_1.levels.convert_level import PymunkLevel
+from game_jams.jam_1.levels.goals import completed
+from game_jams.jam_1.levels.raw_level import LevelInfo, RawLevel, TileBoard
+
+
+def goal_events(concurrent_step: bool) -> list[tuple[str, tuple[int, int] | None]]:
+    rows = [[2, 0, 3, 0, 3], [0, 0, 0, 0, 0], [1, 1, 1, 1, 1]]
+    raw_level = RawLevel(LevelInfo("Goals", "default", 5, 6), TileBoard.from_rows(rows), TileBoard.from_rows(rows))
+    level = PymunkLevel(raw_level, layout="split", concurrent_step=concurrent_step)
+    for bodies in level.dynamic_bodies:
+        for body in bodies:
+            body.velocity = (150, 0)
+    events = []
+    for _ in range(120):
+        level.step()
+        events += [(kind, None if goal is None else (round(goal.bb.left), round(goal.bb.bottom)))
+                   for kind, goal in level.goal_tracker.poll()]
+    return events
+
+
+def test_concurrent_halves_give_sequential_goal_events():
+    expected = goal_events(concurrent_step=False)
+    assert expected
+    for _ in range(20):
+        events = goal_events(concurrent_step=True)
+        assert events == expected
+        assert [kind for kind, _ in events].count(completed) <= 1
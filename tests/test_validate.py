@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+from game_jams.jam_1.levels.validate import check_level, check_levels, reachable
+
+
+def write_level(path, header: str, upper: list[str], lower: list[str]):
+    path.write_text("\n".join([header] + upper + ["!"] + lower))
+    return path
+
+
+def test_valid_level_is_reachable(tmp_path):
+    path = write_level(tmp_path / "level_1_1.csv", "Test,default,3,2", ["2,0,3", "1,1,1"], ["2,0,3", "1,1,1"])
+    report = check_level(path)
+    assert report.ok
+    assert report.search == reachable
+
+
+def test_malformed_cell_is_reported(tmp_path):
+    path = write_level(tmp_path / "level_1_1.csv", "Test,default,3,2", ["2,²,3", "1,1,1"], ["2,0,3", "1,1,1"])
+    report = check_level(path)
+    assert not report.ok
+    assert any("'²'" in error for error in report.errors)
+
+
+def test_malformed_header_is_reported(tmp_path):
+    path = write_level(tmp_path / "level_1_1.csv", "Test,default,³,2", ["2,0,3", "1,1,1"], ["2,0,3", "1,1,1"])
+    report = check_level(path)
+    assert not report.ok
+    assert any(error.startswith("header width and height") for error in report.errors)
+
+
+def test_malformed_level_does_not_stop_pool(tmp_path):
+    good = write_level(tmp_path / "level_1_1.csv", "Test,default,3,2", ["2,0,3", "1,1,1"], ["2,0,3", "1,1,1"])
+    bad = write_level(tmp_path / "level_1_2.csv", "Test,default,3,2", ["2,٣,3", "1,1,1"], ["2,0,3", "1,1,1"])
+    reports = check_levels([good, bad], workers=2)
+    assert [report.ok for report in reports] == [True, False]